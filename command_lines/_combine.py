@@ -0,0 +1,123 @@
+import argparse
+import os
+import warnings
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, List
+
+from src.irony import Combine, FitsArray
+
+
+def prefixes(options: Dict[str, str]) -> Dict[str, str]:
+    """
+    Returns a table of every (casefolded) prefix of the options and their values. If a prefix is shared by more than
+    one option, the first option wins.
+
+    :param options: Full option names and their values, in order of precedence.
+    :return: Prefix table
+    """
+    table = {}
+    for option, value in options.items():
+        option = option.casefold()
+        for i in range(len(option) + 1):
+            table.setdefault(option[:i], value)
+
+    return table
+
+
+OPERATIONS = frozenset({"average", "median"})
+REJECTIONS = frozenset({"none", "minmax", "ccdclip", "crreject", "sigclip", "avsigclip", "pclip"})
+SCALES = frozenset({"none", "mode", "median", "mean", "exposure", "borderpix"})
+
+# Abbreviations accepted by the older command lines. Kept so existing scripts keep working.
+LEGACY_OPERATIONS = prefixes({"AVERAGE": "average", "MEDIAN": "median"})
+
+LEGACY_REJECTIONS = prefixes({
+    "MINMAX": "minmax",
+    "CCDCLIP": "ccdclip",
+    "CRREJECT": "crreject",
+    "SIGRECT": "sigclip",
+    "SIGCLIP": "sigclip",
+    "AVGSIGCLIP": "avsigclip",
+    "PCLIP": "pclip",
+    "NONE": "none",
+})
+
+# Minimum number of images Combine accepts for each rejection method.
+MIN_IMAGES_BY_REJ = {
+    "none": 1, "minmax": 3, "ccdclip": 3, "crreject": 3, "sigclip": 3, "avsigclip": 3, "pclip": 3,
+}
+
+LEGACY_SCALES = prefixes({"MODE": "mode", "MEDIAN": "median", "MEAN": "mean", "EXPOSURE": "exposure", "NONE": "none"})
+
+
+def resolve(word: str, options: FrozenSet[str], legacy: Dict[str, str]) -> str:
+    """
+    Returns the option given by word (case insensitive). Abbreviations of the older command lines are still accepted
+    with a DeprecationWarning.
+
+    :param word: The option given by user.
+    :param options: Valid option names.
+    :param legacy: Prefix table of deprecated abbreviations created by prefixes.
+    :return: Resolved option
+    """
+    word = word.casefold()
+    if word in options:
+        return word
+
+    if word in legacy:
+        warnings.warn(f"'{word}' is deprecated. Use '{legacy[word]}' instead.", DeprecationWarning)
+        return legacy[word]
+
+    raise argparse.ArgumentTypeError(f"invalid choice: '{word}' (choose from {'|'.join(sorted(options))})")
+
+
+def option(options: FrozenSet[str], legacy: Dict[str, str]) -> Callable[[str], str]:
+    """
+    Returns an argparse type which resolves the option given by user.
+
+    :param options: Valid option names.
+    :param legacy: Prefix table of deprecated abbreviations created by prefixes.
+    :return: argparse type
+    """
+    def resolver(word: str) -> str:
+        return resolve(word, options, legacy)
+
+    return resolver
+
+
+def run_combine(files: List[str], output: str, discrete: str, method: str, **kwargs) -> None:
+    """
+    Runs the given combine method of Combine on files. Groups the files first if discrete is given.
+
+    :param files: List of images to combine.
+    :param output: Output image name. Used as root image name if discrete is given.
+    :param discrete: Header key to group the images by. If None all images are combined together.
+    :param method: Name of the Combine method. darkcombine|flatcombine|zerocombine.
+    :param kwargs: Parameters to be passed to the combine method.
+    :return: None
+    """
+    if isinstance(files, str):
+        files = [files]
+
+    fa = FitsArray.from_paths(files)
+
+    if discrete is not None:
+        out_path_base = Path(output).absolute()
+        parent, stem, suffix = os.fspath(out_path_base.parent), out_path_base.stem, out_path_base.suffix
+        keys, groups = [], []
+        min_images = MIN_IMAGES_BY_REJ.get(kwargs.get("reject"), 1)
+        for g, img in fa.groupby(discrete).items():
+            if len(img) < min_images:
+                print(f"Image count for {discrete}={g} is not enough. Skipping...")
+                continue
+
+            out_path = os.path.join(parent, f"{stem}_{g}{suffix}")
+            keys.append(g)
+            groups.append((img, {**kwargs, "output": out_path}))
+
+        for g, combined in zip(keys, Combine.combine_many(groups, method)):
+            if combined is None:
+                print(f"Image count for {discrete}={g} is not enough. Skipping...")
+    else:
+        co = Combine(fa)
+        _ = getattr(co, method)(output=output, **kwargs)
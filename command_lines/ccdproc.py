@@ -1,5 +1,10 @@
+import argparse
+from pathlib import Path
 from typing import List
 
+from src.irony.errors import NothingToDoError
+from src.irony import Calibration, Fits, FitsArray
+
 
 def ccdproc(files: List[str], output: str, zero: str, dark: str, flat: str) -> None:
     """
@@ -12,12 +17,8 @@ def ccdproc(files: List[str], output: str, zero: str, dark: str, flat: str) -> N
     :param flat: Flat field calibration images.
     :return: None
     """
-    from src.irony import NothingToDoError
-    from src.irony import Calibration, Fits, FitsArray
-    from pathlib import Path
-
     if not Path(output).is_dir():
-        FileNotFoundError(f"{output} does not exist")
+        raise FileNotFoundError(f"{output} does not exist")
 
     images = FitsArray.from_paths(files)
     zero = zero if zero is None else Fits.from_path(zero)
@@ -32,8 +33,6 @@ def ccdproc(files: List[str], output: str, zero: str, dark: str, flat: str) -> N
 
 
 def main():
-    import argparse
-
     parser = argparse.ArgumentParser(
         prog='darkcombine',
         description='Does iraf darkcombine')
@@ -20,8 +20,12 @@ setup(
         'pandas',
         'photutils',
         'pyraf',
+        'scikit-image',
         'sep',
     ],
+    extras_require={
+        'fast': ['bottleneck', 'numba'],
+    },
     classifiers=[
         'Natural Language :: English',
         'Intended Audience :: Developers',
@@ -1,4 +1,4 @@
-from .calculator import Calculator, Coordinates
+from .calculator import Calculator, CalculatorResult, Coordinates
 from .calibration import Calibration
 from .combine import Combine
 from .fits import Fits, FitsArray
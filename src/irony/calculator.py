@@ -1,16 +1,129 @@
-from typing import List, Union
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Tuple, Union
 
+import numpy as np
 import pandas as pd
 from astropy import units
-from astropy.coordinates import AltAz, EarthLocation, SkyCoord
-from astropy.time import Time as ATime
+from astropy.coordinates import AltAz, EarthLocation, SkyCoord, solar_system_ephemeris
+from astropy.coordinates.erfa_astrom import ErfaAstromInterpolator, erfa_astrom
+from astropy.time import Time as ATime, TimeDelta
 
 from .base_logger import logger
 from .fits import FitsArray
 
+ALTAZ_CACHE_SIZE = 8
+LTT_JD_DECIMALS = 4
+TIME_RESOLUTION = 300
+_altaz_frames: OrderedDict = OrderedDict()
+
+
+@dataclass(frozen=True, slots=True)
+class CalculatorResult:
+    """
+    Single column result of Calculator's _c methods. Behaves like the one column pd.DataFrame it replaces.
+    """
+    name: str
+    values: np.ndarray
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        if key != self.name:
+            raise KeyError(key)
+
+        return self.values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __array__(self, dtype=None) -> np.ndarray:
+        return np.asarray(self.values, dtype=dtype)
+
+    @property
+    def columns(self) -> List[str]:
+        return [self.name]
+
+    def to_numpy(self) -> np.ndarray:
+        return self.values.reshape(-1, 1)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({self.name: self.values})
+
+
+def _altaz_frame(times: ATime, location: EarthLocation) -> AltAz:
+    """
+    Returns the AltAz frame of the given times and location. The last ALTAZ_CACHE_SIZE frames are kept and reused.
+    The location is kept alongside its frame, so its id cannot be reused while cached.
+    """
+    if not isinstance(times, ATime):
+        times = ATime(times)
+
+    key = (hash(times.jd.tobytes()), times.scale, id(location))
+    if key in _altaz_frames:
+        _altaz_frames.move_to_end(key)
+        return _altaz_frames[key][1]
+
+    frame = AltAz(obstime=times, location=location)
+    _altaz_frames[key] = (location, frame)
+    if len(_altaz_frames) > ALTAZ_CACHE_SIZE:
+        _altaz_frames.popitem(last=False)
+
+    return frame
+
+
+def _to_time(dates, date_format: str, scale: str) -> ATime:
+    """
+    Returns the astropy.time.Time of dates. If date_format is auto, numeric dates are read as JD and every other date
+    as isot. A Time is returned as is.
+    """
+    if isinstance(dates, ATime):
+        return dates
+
+    if date_format == "auto":
+        try:
+            jds = np.asarray(pd.to_numeric(np.ravel(dates), errors="raise"), dtype=np.float64)
+        except (ValueError, TypeError):
+            date_format = "isot"
+        else:
+            return ATime(jds.reshape(np.shape(dates)), format="jd", scale=scale)
+
+    return ATime(dates, format=date_format, scale=scale)
+
+
+def _secz(position: SkyCoord, frame: AltAz, time_resolution: float) -> np.ndarray:
+    """
+    Returns secz of position in frame. The astrometric context is interpolated over time_resolution seconds.
+    """
+    with erfa_astrom.set(ErfaAstromInterpolator(time_resolution * units.s)):
+        obj_alt_az = position.transform_to(frame)
+
+    return obj_alt_az.secz.value
+
+
+@lru_cache(maxsize=256)
+def _ltt(ra: float, dec: float, kind: str, jds: bytes, scale: str, ephemeris: str) -> TimeDelta:
+    times = ATime(np.frombuffer(jds), format="jd", scale=scale)
+    position = SkyCoord(ra=ra * units.deg, dec=dec * units.deg)
+    return times.light_travel_time(position, kind, ephemeris=ephemeris)
+
+
+def _light_travel_time(times: ATime, position: SkyCoord, kind: str, ephemeris: str = None) -> TimeDelta:
+    """
+    Returns the light travel time of the given times and position. Times are rounded to LTT_JD_DECIMALS decimals of a
+    day (~8.6 s, well below the variation of the correction) so the result can be reused between calls. If ephemeris
+    is None the current solar_system_ephemeris is used.
+    """
+    if ephemeris is None:
+        ephemeris = solar_system_ephemeris.get()
+
+    icrs = position.icrs
+    jds = np.round(np.atleast_1d(times.jd).astype(np.float64), LTT_JD_DECIMALS)
+    ltt = _ltt(float(icrs.ra.deg), float(icrs.dec.deg), kind, jds.tobytes(), times.scale, ephemeris)
+    return ltt if times.shape else ltt[0]
+
 
 class Calculator:
-    def __init__(self, fits_array: FitsArray) -> None:
+    def __init__(self, fits_array: FitsArray, defer_writes: bool = False) -> None:
         """
         Constructor method.
         Creates a Calculator Object.
@@ -19,10 +132,15 @@ class Calculator:
         ----------
         fits_array: FitsArray
             A FitsArray.
+        defer_writes: bool, optional
+            If True, calculated header values are kept in memory and written to files in one pass by commit.
         """
-        logger.info(f"Creating an instance from {self.__class__.__name__}")
+        logger.info("Creating an instance from %s", self.__class__.__name__)
 
         self.fits_array = fits_array
+        self.defer_writes = defer_writes
+        self._time_cache: Dict[Tuple[str, str, str], ATime] = {}
+        self._pending: Dict[str, List[Union[str, float]]] = {}
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}(id: {id(self)}, fits_array: {self.fits_array})"
@@ -30,6 +148,103 @@ class Calculator:
     def __repr__(self) -> str:
         return self.__str__()
 
+    @staticmethod
+    def __values(times: pd.Series) -> np.ndarray:
+        values = times.infer_objects().to_numpy()
+        if values.dtype == object:
+            return np.asarray(values, dtype=str)
+
+        return values
+
+    def _get_time(self, key: str, date_format: str, scale: str) -> Union[ATime, None]:
+        """
+        Returns the astropy.time.Time of the DATEs stored in key. Headers are read only on the first call for each
+        key, date_format and scale.
+
+        Parameters
+        ----------
+        key: str
+            The key where DATE is stored.
+        date_format: str
+            Time format of the DATE. auto reads numeric DATEs as JD.
+        scale: str
+            Scale of the DATEs.
+
+        Returns
+        -------
+        astropy.time.Time or None
+            Time object. None if the key was not found in headers.
+        """
+        cache_key = (key, date_format, scale)
+        if cache_key not in self._time_cache:
+            times = self.fits_array.hselect(key)
+            if len(times) == 0:
+                return None
+
+            self._time_cache[cache_key] = _to_time(self.__values(times[key]), date_format, scale)
+
+        return self._time_cache[cache_key]
+
+    def invalidate_time_cache(self, key: str = None) -> None:
+        """
+        Clears the cached times. Must be called if the headers of the FitsArray were changed outside the Calculator.
+
+        Parameters
+        ----------
+        key: str, optional
+            The key of which cached times to be cleared. If None all cached times will be cleared.
+
+        Returns
+        -------
+        None
+            None.
+        """
+        logger.info("Invalidating time cache. Parameters: key=%r", key)
+        if key is None:
+            self._time_cache.clear()
+            return
+
+        for cache_key in [each for each in self._time_cache if each[0] == key]:
+            del self._time_cache[cache_key]
+
+    def update_headers(self, updates: Dict[str, List[Union[str, float]]]) -> None:
+        """
+        Writes the given header values to files. Each file is opened only once for all keys.
+
+        Parameters
+        ----------
+        updates: Dict[str, List[Union[str, float]]]
+            Keys to be inserted and their values. One value for each file in the FitsArray.
+
+        Returns
+        -------
+        None
+            None.
+        """
+        logger.info("Updating headers. Parameters: updates=%r", updates)
+        self.fits_array.hedit_columns(updates)
+        for key in updates:
+            self.invalidate_time_cache(key)
+
+    def commit(self) -> None:
+        """
+        Writes all calculated header values waiting to be written. Only useful if defer_writes is True.
+
+        Returns
+        -------
+        None
+            None.
+        """
+        logger.info("Committing headers. Parameters: None")
+        pending, self._pending = self._pending, {}
+        self.update_headers(pending)
+
+    def __write(self, key: str, values: List[Union[str, float]]) -> None:
+        if self.defer_writes:
+            self._pending[key] = values
+        else:
+            self.update_headers({key: values})
+
     def jd(self, key: str, new_key: str = "JD", date_format: str = "isot", scale: str = "utc") -> None:
         """
         Inserts a header wth key of new_key and value of JD which calculated from key.
@@ -41,7 +256,7 @@ class Calculator:
         new_key: str, optional
             New key name for JD to be inserted. Default: JD.
         date_format: str, optional
-            Time format of the DATE. Default: isot.
+            Time format of the DATE. auto reads numeric DATEs as JD. Default: isot.
         scale: str, optional
             Scale of the DATEs. Default: utc.
         Returns
@@ -49,40 +264,41 @@ class Calculator:
         None
             None.
         """
-        logger.info(f"Calculating JD. Parameters: {key=}, {new_key=}, {date_format=}, {scale=}")
-        times = self.fits_array.hselect(key)
-        if len(times) == 0:
+        logger.info(
+            "Calculating JD. Parameters: key=%r, new_key=%r, date_format=%r, scale=%r", key, new_key, date_format, scale
+        )
+        times = self._get_time(key, date_format, scale)
+        if times is None:
             return
 
-        jds = ATime(times[key].to_numpy().tolist(), format=date_format, scale=scale).jd
-        for fits, jd in zip(self.fits_array, jds):
-            fits.hedit(new_key, str(jd))
+        self.__write(new_key, times.jd.tolist())
 
     @classmethod
-    def jd_c(cls, dates: Union[str, List[str]], date_format: str = "isot", scale: str = "utc") -> pd.DataFrame:
+    def jd_c(cls, dates: Union[str, List[str], ATime], date_format: str = "isot",
+             scale: str = "utc") -> CalculatorResult:
         """
         Returns JD of the given DATEs.
 
         Parameters
         ----------
-        dates: str or List[str]
+        dates: str, List[str] or astropy.time.Time
             DATE or List of DATEs (utc).
         date_format: str, optional
-            Time format of the DATE. Default: isot.
+            Time format of the DATE. auto reads numeric DATEs as JD. Default: isot.
         scale: str, optional
             Scale of the DATEs. Default: utc.
 
         Returns
         -------
-        pd.DataFrame
-            List of JDs.
+        CalculatorResult
+            List of JDs. Use to_frame() for a pd.DataFrame.
         """
-        logger.info(f"Calculating JD. Parameters: {dates=}, {date_format=}, {scale=}")
-        jds = ATime(dates, format=date_format, scale=scale).jd
-        return pd.DataFrame({"jd": jds})
+        logger.info("Calculating JD. Parameters: dates=%r, date_format=%r, scale=%r", dates, date_format, scale)
+        jds = _to_time(dates, date_format, scale).jd
+        return CalculatorResult("jd", np.atleast_1d(jds))
 
     def hjd(self, key: str, position: SkyCoord, new_key: str = "HJD", date_format: str = "isot",
-            scale: str = "utc") -> None:
+            scale: str = "utc", ephemeris: str = "builtin") -> None:
         """
         Inserts a header wth key of new_key and value of HJD which calculated from key.
 
@@ -95,59 +311,72 @@ class Calculator:
         new_key: str, optional
             New key name for HJD to be inserted. Default: HJD.
         date_format: str, optional
-            Time format of the DATE. Default: isot.
+            Time format of the DATE. auto reads numeric DATEs as JD. Default: isot.
         scale: str, optional
             Scale of the DATEs. Default: utc.
+        ephemeris: str, optional
+            Solar system ephemeris. builtin (ERFA, no file I/O) is accurate to some tens of microseconds in light
+            travel time. Use e.g. de432s for JPL precision. None uses the current solar_system_ephemeris.
+            Default: builtin.
 
         Returns
         -------
         None
             None.
         """
-        logger.info(f"Calculating JD. Parameters: {key=}, {position=}, {new_key=}, {date_format=}, {scale=}")
-        times = self.fits_array.hselect(key)
-        if len(times) == 0:
+        logger.info(
+            "Calculating JD. Parameters: key=%r, position=%r, new_key=%r, date_format=%r, scale=%r, "
+            "ephemeris=%r",
+            key, position, new_key, date_format, scale, ephemeris
+        )
+        times = self._get_time(key, date_format, scale)
+        if times is None:
             return
 
-        times = ATime(times[key].to_numpy().tolist(), format=date_format, scale=scale)
-        ltt_helio = times.light_travel_time(position, 'heliocentric')
+        ltt_helio = _light_travel_time(times, position, "heliocentric", ephemeris)
         times_heliocentre = times.utc + ltt_helio
-
-        for fits, hjd in zip(self.fits_array, times_heliocentre):
-            fits.hedit(new_key, str(hjd))
+        self.__write(new_key, times_heliocentre.value.tolist())
 
     @classmethod
-    def hjd_c(cls, dates: Union[str, List[str]], position: SkyCoord, new_key: str = "HJD", date_format: str = "isot",
-              scale: str = "utc") -> pd.DataFrame:
+    def hjd_c(cls, dates: Union[str, List[str], ATime], position: SkyCoord, new_key: str = "HJD",
+              date_format: str = "isot", scale: str = "utc", ephemeris: str = "builtin") -> pd.DataFrame:
         """
         Inserts a header wth key of new_key and value of HJD which calculated from key.
 
         Parameters
         ----------
-        dates: str or List[str]
+        dates: str, List[str] or astropy.time.Time
             DATE or List of DATEs (utc).
         position: SkyCoord
             SkyCoord object of the Object.
         new_key: str, optional
             New key name for HJD to be inserted. Default: HJD.
         date_format: str, optional
-            Time format of the DATE. Default: isot.
+            Time format of the DATE. auto reads numeric DATEs as JD. Default: isot.
         scale: str, optional
             Scale of the DATEs. Default: utc.
+        ephemeris: str, optional
+            Solar system ephemeris. builtin (ERFA, no file I/O) is accurate to some tens of microseconds in light
+            travel time. Use e.g. de432s for JPL precision. None uses the current solar_system_ephemeris.
+            Default: builtin.
 
         Returns
         -------
         pd.DataFrame
             List of HJDs.
         """
-        logger.info(f"Calculating JD. Parameters: {dates=}, {position=}, {new_key=}, {date_format=}, {scale=}")
-        times = ATime(dates, format=date_format, scale=scale)
-        ltt_helio = times.light_travel_time(position, 'heliocentric')
+        logger.info(
+            "Calculating JD. Parameters: dates=%r, position=%r, new_key=%r, date_format=%r, scale=%r, "
+            "ephemeris=%r",
+            dates, position, new_key, date_format, scale, ephemeris
+        )
+        times = _to_time(dates, date_format, scale)
+        ltt_helio = _light_travel_time(times, position, "heliocentric", ephemeris)
         times_heliocentre = times.utc + ltt_helio
         return pd.DataFrame({"hjd": times_heliocentre})
 
     def bjd(self, key: str, position: SkyCoord, new_key: str = "BJD", date_format: str = "isot",
-            scale: str = "utc") -> None:
+            scale: str = "utc", ephemeris: str = "builtin") -> None:
         """
         Inserts a header wth key of new_key and value of BJD which calculated from key.
 
@@ -160,54 +389,67 @@ class Calculator:
         new_key: str, optional
             New key name for HJD to be inserted. Default: BJD.
         date_format: str, optional
-            Time format of the DATE. Default: isot.
+            Time format of the DATE. auto reads numeric DATEs as JD. Default: isot.
         scale: str, optional
             Scale of the DATEs. Default: utc.
+        ephemeris: str, optional
+            Solar system ephemeris. builtin (ERFA, no file I/O) is accurate to some tens of microseconds in light
+            travel time. Use e.g. de432s for JPL precision. None uses the current solar_system_ephemeris.
+            Default: builtin.
 
         Returns
         -------
         None
             None.
         """
-        logger.info(f"Calculating JD. Parameters: {key=}, {position=}, {new_key=}, {date_format=}, {scale=}")
-        times = self.fits_array.hselect(key)
-        if len(times) == 0:
+        logger.info(
+            "Calculating JD. Parameters: key=%r, position=%r, new_key=%r, date_format=%r, scale=%r, "
+            "ephemeris=%r",
+            key, position, new_key, date_format, scale, ephemeris
+        )
+        times = self._get_time(key, date_format, scale)
+        if times is None:
             return
 
-        times = ATime(times[key].to_numpy().tolist(), format=date_format, scale=scale)
-        ltt_helio = times.light_travel_time(position)
+        ltt_helio = _light_travel_time(times, position, "barycentric", ephemeris)
         times_heliocentre = times.utc + ltt_helio
-
-        for fits, hjd in zip(self.fits_array, times_heliocentre):
-            fits.hedit(new_key, str(hjd))
+        self.__write(new_key, times_heliocentre.value.tolist())
 
     @classmethod
-    def bjd_c(cls, dates: Union[str, List[str]], position: SkyCoord, new_key: str = "BJD", date_format: str = "isot",
-              scale: str = "utc") -> pd.DataFrame:
+    def bjd_c(cls, dates: Union[str, List[str], ATime], position: SkyCoord, new_key: str = "BJD",
+              date_format: str = "isot", scale: str = "utc", ephemeris: str = "builtin") -> pd.DataFrame:
         """
         Inserts a header wth key of new_key and value of BJD which calculated from key.
 
         Parameters
         ----------
-        dates: str or List[str]
+        dates: str, List[str] or astropy.time.Time
             DATE or List of DATEs (utc).
         position: SkyCoord
             SkyCoord object of the Object.
         new_key: str, optional
             New key name for BJD to be inserted. Default: BJD.
         date_format: str, optional
-            Time format of the DATE. Default: isot.
+            Time format of the DATE. auto reads numeric DATEs as JD. Default: isot.
         scale: str, optional
             Scale of the DATEs. Default: utc.
+        ephemeris: str, optional
+            Solar system ephemeris. builtin (ERFA, no file I/O) is accurate to some tens of microseconds in light
+            travel time. Use e.g. de432s for JPL precision. None uses the current solar_system_ephemeris.
+            Default: builtin.
 
         Returns
         -------
         pd.DataFrame
             List of BJDs.
         """
-        logger.info(f"Calculating JD. Parameters: {dates=}, {position=}, {new_key=}, {date_format=}, {scale=}")
-        times = ATime(dates, format=date_format, scale=scale)
-        ltt_helio = times.light_travel_time(position)
+        logger.info(
+            "Calculating JD. Parameters: dates=%r, position=%r, new_key=%r, date_format=%r, scale=%r, "
+            "ephemeris=%r",
+            dates, position, new_key, date_format, scale, ephemeris
+        )
+        times = _to_time(dates, date_format, scale)
+        ltt_helio = _light_travel_time(times, position, "barycentric", ephemeris)
         times_heliocentre = times.utc + ltt_helio
         return pd.DataFrame({"hjd": times_heliocentre})
 
@@ -220,7 +462,7 @@ class Calculator:
         key: str
             The key where DATE (utc) is stored.
         date_format: str, optional
-            Time format of the DATE. Default: isot.
+            Time format of the DATE. auto reads numeric DATEs as JD. Default: isot.
         scale: str, optional
             Scale of the DATEs. Default: utc.
 
@@ -229,24 +471,27 @@ class Calculator:
         astropy.time.Time
             Time object.
         """
-        logger.info(f"Converting to astropy.time.Time. Parameters: {key=}, {date_format=}, {scale=}")
-        times = self.fits_array.hselect(key)
-        if len(times) == 0:
+        logger.info(
+            "Converting to astropy.time.Time. Parameters: key=%r, date_format=%r, scale=%r", key, date_format, scale
+        )
+        times = self._get_time(key, date_format, scale)
+        if times is None:
             raise ValueError("Time not found")
 
-        return ATime(times[key].to_numpy().flatten().tolist(), format=date_format, scale=scale)
+        return times
 
     @classmethod
-    def astropy_time_c(cls, dates: Union[str, List[str]], date_format: str = "isot", scale: str = "utc") -> ATime:
+    def astropy_time_c(cls, dates: Union[str, List[str], ATime], date_format: str = "isot",
+                       scale: str = "utc") -> ATime:
         """
         Returns a list of astropy.time.Time from given DATEs in header.
 
         Parameters
         ----------
-        dates: str or List[str]
+        dates: str, List[str] or astropy.time.Time
             The key where DATE (utc) is stored.
         date_format: str, optional
-            Time format of the DATE. Default: isot.
+            Time format of the DATE. auto reads numeric DATEs as JD. Default: isot.
         scale: str, optional
             Scale of the DATEs. Default: utc.
 
@@ -255,14 +500,19 @@ class Calculator:
         astropy.time.Time
             Time object.
         """
-        logger.info(f"Converting to astropy.time.Time. Parameters: {dates=}, {date_format=}, {scale=}")
+        logger.info(
+            "Converting to astropy.time.Time. Parameters: dates=%r, date_format=%r, scale=%r", dates, date_format, scale
+        )
+        if isinstance(dates, ATime):
+            return dates
+
         if len(dates) == 0:
             raise ValueError("Time not found")
 
-        return ATime(dates, format=date_format, scale=scale)
+        return _to_time(dates, date_format, scale)
 
     def sec_z(self, key: str, location: EarthLocation, position: SkyCoord, new_key: str = "ARIMASS",
-              date_format: str = "isot", scale: str = "utc") -> None:
+              date_format: str = "isot", scale: str = "utc", time_resolution: float = TIME_RESOLUTION) -> None:
         """
         Inserts a header wth key of new_key and value of secz which calculated from key.
 
@@ -277,9 +527,11 @@ class Calculator:
         new_key: str, optional
             New key name for SECZ to be inserted. Default: ARIMASS.
         date_format: str, optional
-            Time format of the DATE. Default: isot.
+            Time format of the DATE. auto reads numeric DATEs as JD. Default: isot.
         scale: str, optional
             Scale of the DATEs. Default: utc.
+        time_resolution: float, optional
+            Time resolution (seconds) of the interpolated astrometric context. Default: 300.
 
         Returns
         -------
@@ -287,43 +539,80 @@ class Calculator:
             None.
         """
         logger.info(
-            f"Calculating secz. Parameters: {key=}, {location=}, {position=}, {new_key=}, {date_format=}, {scale=}")
+            "Calculating secz. Parameters: key=%r, location=%r, position=%r, new_key=%r, date_format=%r, scale=%r, "
+            "time_resolution=%r",
+            key, location, position, new_key, date_format, scale, time_resolution
+        )
         times = self.astropy_time(key, date_format=date_format, scale=scale)
 
-        frame = AltAz(obstime=times, location=location)
-        obj_alt_az = position.transform_to(frame)
-        obj_alt = obj_alt_az.secz
-        seczs = obj_alt.value.tolist()
-        for fits, secz in zip(self.fits_array, seczs):
-            fits.hedit(new_key, str(secz))
+        frame = _altaz_frame(times, location)
+        self.__write(new_key, _secz(position, frame, time_resolution).tolist())
 
     @classmethod
-    def sec_z_c(cls, times: ATime, location: EarthLocation, position: SkyCoord) -> pd.DataFrame:
+    def sec_z_c(cls, times: Union[ATime, List[str], np.ndarray], location: EarthLocation, position: SkyCoord,
+                time_resolution: float = TIME_RESOLUTION) -> CalculatorResult:
         """
         Returns secz which calculated from DATEs and given location and position.
 
         Parameters
         ----------
-        times: astropy.time.Time
+        times: astropy.time.Time, List[str] or np.ndarray
             List of dates.
         location: EarthLocation
             EarthLocation of the Observation site.
         position: SkyCoord
             SkyCoord object of the Object.
+        time_resolution: float, optional
+            Time resolution (seconds) of the interpolated astrometric context. Default: 300.
 
         Returns
         -------
-        pd.DataFrame
-            List of secz.
+        CalculatorResult
+            List of secz. Use to_frame() for a pd.DataFrame.
         """
-        logger.info(f"Calculating secz. Parameters: {times=}, {location=}, {position=}")
-        frame = AltAz(obstime=times, location=location)
-        obj_alt_az = position.transform_to(frame)
-        obj_alt = obj_alt_az.secz
-        return pd.DataFrame({"secz": obj_alt.value.tolist()})
+        logger.info(
+            "Calculating secz. Parameters: times=%r, location=%r, position=%r, time_resolution=%r",
+            times, location, position, time_resolution
+        )
+        frame = _altaz_frame(times, location)
+        return CalculatorResult("secz", np.atleast_1d(_secz(position, frame, time_resolution)))
+
+
+@lru_cache(maxsize=128)
+def _location_from_name(name: str) -> EarthLocation:
+    return EarthLocation.of_site(name)
+
+
+@lru_cache(maxsize=128)
+def _location(longitude: float, latitude: float, altitude: float) -> EarthLocation:
+    return EarthLocation(longitude * units.deg, latitude * units.deg, altitude * units.m)
+
+
+@lru_cache(maxsize=128)
+def _position_from_name(name: str) -> SkyCoord:
+    return SkyCoord.from_name(name, frame="icrs")
+
+
+@lru_cache(maxsize=128)
+def _position(ra: float, dec: float) -> SkyCoord:
+    return SkyCoord(ra=ra, dec=dec, unit=(units.hourangle, units.deg), frame="icrs")
 
 
 class Coordinates:
+    @classmethod
+    def clear_cache(cls) -> None:
+        """
+        Clears the cached locations and positions.
+
+        Returns
+        -------
+        None
+            None.
+        """
+        logger.info("Clearing Coordinates cache. Parameters: None")
+        for cached in (_location_from_name, _location, _position_from_name, _position):
+            cached.cache_clear()
+
     @classmethod
     def location_from_name(cls, name: str) -> EarthLocation:
         """
@@ -339,21 +628,23 @@ class Coordinates:
         EarthLocation
             Location.
         """
-        logger.info(f"Creating EarthLocation. Parameters: {name=}")
-        return EarthLocation.of_site(name)
+        logger.info("Creating EarthLocation. Parameters: name=%r", name)
+        return _location_from_name(name)
 
     @classmethod
-    def location(cls, longitude: float, latitude: float, altitude: float = 0) -> EarthLocation:
+    def location(cls, longitude: Union[float, np.ndarray], latitude: Union[float, np.ndarray],
+                 altitude: Union[float, np.ndarray] = 0) -> EarthLocation:
         """
-        Returns an EarthLocation from given longitude, latitude and altitude.
+        Returns an EarthLocation from given longitude, latitude and altitude. If any of them is array-like, one
+        array-valued EarthLocation is returned.
 
         Parameters
         ----------
-        longitude: float
+        longitude: float or np.ndarray
             longitude of the location.
-        latitude: float
+        latitude: float or np.ndarray
             latitude of the location.
-        altitude: float
+        altitude: float or np.ndarray
             altitude of the location.
 
         Returns
@@ -361,7 +652,16 @@ class Coordinates:
         EarthLocation
             Location.
         """
-        logger.info(f"Creating EarthLocation. Parameters: {longitude=}, {latitude=}, {altitude=}")
+        logger.info(
+            "Creating EarthLocation. Parameters: longitude=%r, latitude=%r, altitude=%r", longitude, latitude, altitude
+        )
+        if np.ndim(longitude) == 0 and np.ndim(latitude) == 0 and np.ndim(altitude) == 0:
+            return _location(longitude, latitude, altitude)
+
+        longitude, latitude, altitude = np.broadcast_arrays(
+            np.asarray(longitude, dtype=np.float64), np.asarray(latitude, dtype=np.float64),
+            np.asarray(altitude, dtype=np.float64)
+        )
         return EarthLocation(longitude * units.deg, latitude * units.deg, altitude * units.m)
 
     @classmethod
@@ -379,19 +679,19 @@ class Coordinates:
         SkyCoord
             Position.
         """
-        logger.info(f"Creating SkyCoord. Parameters: {name=}")
-        return SkyCoord.from_name(name, frame="icrs")
+        logger.info("Creating SkyCoord. Parameters: name=%r", name)
+        return _position_from_name(name)
 
     @classmethod
-    def position(cls, ra: float, dec: float) -> SkyCoord:
+    def position(cls, ra: Union[float, np.ndarray], dec: Union[float, np.ndarray]) -> SkyCoord:
         """
-        Returns a SkyCoord from given ra and dec.
+        Returns a SkyCoord from given ra and dec. If they are array-like, one array-valued SkyCoord is returned.
 
         Parameters
         ----------
-        ra: float
+        ra: float or np.ndarray
             right ascension.
-        dec: float
+        dec: float or np.ndarray
             declination.
 
         Returns
@@ -399,5 +699,8 @@ class Coordinates:
         SkyCoord
             Position.
         """
-        logger.info(f"Creating SkyCoord. Parameters: {ra=}, {dec=}")
-        return SkyCoord(ra=ra, dec=dec, unit=(units.hourangle, units.deg), frame="icrs")
+        logger.info("Creating SkyCoord. Parameters: ra=%r, dec=%r", ra, dec)
+        if np.ndim(ra) == 0 and np.ndim(dec) == 0:
+            return _position(ra, dec)
+
+        return SkyCoord(ra=np.asarray(ra), dec=np.asarray(dec), unit=(units.hourangle, units.deg), frame="icrs")
@@ -1,15 +1,378 @@
-from subprocess import PIPE
-
+import asyncio
+import contextlib
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+import numpy as np
+from astropy.io import fits as fts
 from pyraf import iraf
 
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 from .base_logger import logger
-from .errors import ImageCountError
+from .errors import ImageCountError, ScaleValueError
 from .fits import Fits, FitsArray
-from .utils import Check, Fixer
+from .utils import Check, Fixer, keep_process, load_iraf, process_pool, unlearn_once, write_fits
+
+MEM_LIMIT = 256 << 20
+NDARRAY_REJECTIONS = frozenset({"none", "minmax", "sigclip"})
+NDARRAY_SCALES = frozenset({"none", "median", "mean", "exposure", "borderpix"})
+SCALE_SUBSAMPLE = 8
+BORDER = 64
+COMBINE_METHODS = frozenset({"combine", "zerocombine", "darkcombine", "flatcombine", "imsum"})
+SCALED_TASKS = frozenset({"darkcombine", "flatcombine"})
+
+
+def _combine_worker(job: Tuple[List[str], str, Dict[str, Any], bool]) -> Union[str, None]:
+    """
+    Runs one combine in a worker process. Each process has its own IRAF state and at_file.
+    """
+    paths, method, kwargs, use_iraf = job
+    try:
+        combined = getattr(Combine(FitsArray.from_paths(paths), use_iraf=use_iraf), method)(**kwargs)
+    except ImageCountError:
+        return None
+
+    return abs(combined)
+
+
+def _job(fits_array: FitsArray, method: str, kwargs: Dict[str, Any],
+         use_iraf: bool) -> Tuple[List[str], str, Dict[str, Any], bool]:
+    """
+    Returns the _combine_worker job of one combine. A temporary output is named here, so it is registered for
+    Fixer.tmp_cleaner in this process and not only in the worker.
+    """
+    if kwargs.get("output") is None:
+        kwargs = {**kwargs, "output": Fixer.output(None, delete=True, prefix="irony_", suffix=".fits")}
+
+    return abs(fits_array), method, kwargs, use_iraf
+
+
+def _iraf_task(task, executable: str = "combine"):
+    """
+    Returns the unlearned IRAF task with its executable kept running in pyraf's process cache, so consecutive
+    combines do not start it again. zero/dark/flatcombine are CL scripts running ccdred's combine executable.
+    """
+    keep_process(executable)
+    return unlearn_once(task)
+
+
+def _reject_minmax(cube: np.ndarray, nlow: int = 1, nhigh: int = 1, nan: bool = False) -> np.ndarray:
+    """
+    Returns the stack without the nlow lowest and nhigh highest values of each pixel. If nan is True, the stack may
+    contain NaNs (already rejected values) and the extremes are replaced with NaN instead.
+    """
+    n = cube.shape[0]
+    if not nan:
+        return np.partition(cube, (nlow, n - nhigh - 1), axis=0)[nlow:n - nhigh]
+
+    cube = np.sort(cube, axis=0)
+    valid = np.sum(~np.isnan(cube), axis=0)
+    index = np.arange(n).reshape((-1,) + (1,) * (cube.ndim - 1))
+    cube[(index < nlow) | (index >= valid - nhigh)] = np.nan
+    return cube
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _sigclip_kernel(flat: np.ndarray, sigma: float, iters: int) -> None:
+        """
+        Numba version of _reject_sigclip on a (N, pixels) stack. Each pixel is clipped on its own in one pass. Runs
+        serially, since _for_each_slab already calls it from a thread per tile.
+        """
+        n, m = flat.shape
+        for j in range(m):
+            column = flat[:, j].copy()
+            for _ in range(iters):
+                valid = column[~np.isnan(column)]
+                if valid.size == 0:
+                    break
+
+                median = np.median(valid)
+                std = np.median(np.abs(valid - median)) * 1.4826
+                if std <= 0:
+                    break
+
+                rejected = False
+                for i in range(n):
+                    if abs(column[i] - median) > sigma * std:
+                        column[i] = np.nan
+                        rejected = True
+
+                if not rejected:
+                    break
+
+            flat[:, j] = column
+
+
+def _reject_sigclip(cube: np.ndarray, sigma: float = 3.0, iters: int = 5) -> np.ndarray:
+    """
+    Replaces the values of each pixel further than sigma robust standard deviations (1.4826 * MAD) from its median
+    with NaN, iterating until nothing more is rejected or iters is reached. The stack is modified in place. Uses a
+    compiled per-pixel kernel if numba is installed.
+    """
+    if njit is not None and cube.flags.c_contiguous:
+        _sigclip_kernel(cube.reshape(cube.shape[0], -1), float(sigma), int(iters))
+        return cube
+
+    for _ in range(iters):
+        median = _median(cube, nan=True)
+        deviation = np.abs(cube - median)
+        std = _median(deviation, nan=True) * 1.4826
+        outliers = (deviation > sigma * std) & (std > 0)
+        if not outliers.any():
+            break
+
+        cube[outliers] = np.nan
+
+    return cube
+
+
+def _cosmic_rays(cube: np.ndarray, sigma: float = 5.0) -> np.ndarray:
+    """
+    Returns the mask of values more than sigma robust standard deviations (1.4826 * MAD) above the median of their
+    pixel. Cosmic rays only add charge, so only the high side is flagged.
+    """
+    median = _median(cube)
+    deviation = cube - median
+    std = _median(np.abs(deviation)) * 1.4826
+    return (deviation > sigma * std) & (std > 0)
+
+
+def _median(cube: np.ndarray, nan: bool = False, overwrite: bool = False) -> np.ndarray:
+    """
+    Median along the stack axis. Uses bottleneck's C kernels if it is installed. If overwrite is True, the stack may be
+    reordered in place.
+    """
+    if bn is not None:
+        return bn.nanmedian(cube, axis=0) if nan else bn.median(cube, axis=0)
+
+    if nan:
+        return np.nanmedian(cube, axis=0, overwrite_input=overwrite)
+
+    return np.median(cube, axis=0, overwrite_input=overwrite)
+
+
+def _mean(cube: np.ndarray, nan: bool = False) -> np.ndarray:
+    """
+    Mean along the stack axis. Uses bottleneck's C kernels if it is installed.
+    """
+    if nan:
+        return bn.nanmean(cube, axis=0) if bn is not None else np.nanmean(cube, axis=0)
+
+    return np.mean(cube, axis=0)
+
+
+def _minmax_mean(cube: np.ndarray, argmin: np.ndarray, argmax: np.ndarray) -> np.ndarray:
+    """
+    Mean of each pixel without its lowest and highest value, given the stack indices of them. Needs one pass over
+    the stack (the sum) instead of a partition.
+    """
+    total = cube.sum(axis=0, dtype=np.float64)
+    low = np.take_along_axis(cube, argmin[np.newaxis], axis=0)[0]
+    high = np.take_along_axis(cube, argmax[np.newaxis], axis=0)[0]
+    return (total - low - high) / (cube.shape[0] - 2)
+
+
+def _reduce(cube: np.ndarray, operation: str, reject: str = "none", nan: bool = False) -> np.ndarray:
+    if reject == "minmax" and operation == "median" and not nan:
+        # Leaving out one lowest and one highest value does not change the median.
+        return _median(cube, overwrite=True)
+
+    if reject == "minmax":
+        cube = _reject_minmax(cube, nan=nan)
+    elif reject == "sigclip":
+        cube = _reject_sigclip(cube)
+        nan = True
+
+    if operation == "median":
+        return _median(cube, nan=nan, overwrite=True)
+
+    return _mean(cube, nan=nan)
+
+
+def _border(hdu: fts.PrimaryHDU, border: int = BORDER) -> np.ndarray:
+    """
+    Returns the pixels of the outer border (picture frame) of the image, border pixels wide. Only these pixels are
+    read, and stars near the centre do not affect their level.
+    """
+    if len(hdu.shape) != 2:
+        return hdu.section[(slice(None, None, SCALE_SUBSAMPLE),) * len(hdu.shape)].ravel()
+
+    h, w = hdu.shape
+    b = min(border, h // 2, w // 2)
+    return np.concatenate([
+        hdu.section[:b].ravel(), hdu.section[h - b:].ravel(),
+        hdu.section[b:h - b, :b].ravel(), hdu.section[b:h - b, w - b:].ravel(),
+    ])
+
+
+def _scale_factors(hdus: List[fts.PrimaryHDU], scale: str) -> Union[np.ndarray, None]:
+    """
+    Returns the multiplicative factor of each image that brings its level (median, mean, exposure time or median of
+    the border pixels) to the mean level of all images. The median and mean are measured on every SCALE_SUBSAMPLE'th
+    pixel.
+    """
+    if scale == "none":
+        return None
+
+    if scale == "exposure":
+        levels = np.array([float(hdu.header["EXPTIME"]) for hdu in hdus])
+    elif scale == "borderpix":
+        levels = np.array([np.median(_border(hdu)) for hdu in hdus])
+    else:
+        statistic = np.median if scale == "median" else np.mean
+        sample = (slice(None, None, SCALE_SUBSAMPLE),) * len(hdus[0].shape)
+        levels = np.array([statistic(hdu.section[sample]) for hdu in hdus])
+
+    return (levels.mean() / levels).astype(np.float32)
+
+
+def _slabs(hdus: List[fts.PrimaryHDU], mem_limit: int, workers: int, itemsize: int = 4) -> List[Tuple[int, int]]:
+    """
+    Returns the (start, stop) rows of the tiles so the raw stacks of all workers never take more than mem_limit bytes.
+    The temporaries of the reduction (median sort copies, rejection masks, float64 sums) are not counted and can take
+    a few times as much.
+    """
+    shape = hdus[0].shape
+    row_bytes = len(hdus) * int(np.prod(shape[1:])) * itemsize
+    tile_rows = max(1, mem_limit // (row_bytes * workers))
+    return [(y0, min(y0 + tile_rows, shape[0])) for y0 in range(0, shape[0], tile_rows)]
+
+
+def _stack_dtype(hdus: List[fts.PrimaryHDU]) -> np.dtype:
+    """
+    Returns the pixel type of the images if they are all 8 or 16 bit integers (after BZERO/BSCALE), else float32.
+    Medians, means and minmax rejection of such images are exact in their own type, at half the memory traffic.
+    """
+    dtypes = {hdu.section[0:1].dtype for hdu in hdus}
+    if len(dtypes) == 1:
+        dtype = dtypes.pop()
+        if np.issubdtype(dtype, np.integer) and dtype.itemsize <= 2:
+            return dtype
+
+    return np.dtype(np.float32)
+
+
+def _stack(hdus: List[fts.PrimaryHDU], y0: int, y1: int, factors: np.ndarray = None,
+           dtype: np.dtype = np.float32) -> np.ndarray:
+    """
+    Returns the stack of rows y0:y1 of all images, multiplied by their scale factors if given. Rows are read
+    through HDU sections, so only the tile is read (and scaled) from the memory-mapped files.
+    """
+    cube = np.empty((len(hdus), y1 - y0) + hdus[0].shape[1:], dtype=dtype)
+    for i, hdu in enumerate(hdus):
+        cube[i] = hdu.section[y0:y1]
+
+    if factors is not None:
+        cube *= factors.reshape((-1,) + (1,) * (cube.ndim - 1))
+
+    return cube
+
+
+def _for_each_slab(hdus: List[fts.PrimaryHDU], mem_limit: int, function: Callable[[int, int], None],
+                   itemsize: int = 4) -> None:
+    """
+    Calls function(y0, y1) for each tile. Tiles are processed in parallel threads (NumPy and bottleneck release the
+    GIL).
+    """
+    workers = os.cpu_count() or 1
+    slabs = _slabs(hdus, mem_limit, workers, itemsize)
+    if len(slabs) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(slabs))) as executor:
+            list(executor.map(lambda slab: function(*slab), slabs))
+    else:
+        function(*slabs[0])
+
+
+def _ndarray_combine(paths: List[str], operation: str, output: str, reject: str = "none", scale: str = "none",
+                     mem_limit: int = MEM_LIMIT, mask: np.ndarray = None,
+                     extremes: Dict[str, np.ndarray] = None) -> None:
+    """
+    Combines the images in-process with NumPy and writes the result to output as float32, like IRAF's combine.
+    Images are stacked in tiles of rows so the raw stacks never take more than mem_limit bytes in total (see _slabs,
+    the temporaries of the reduction come on top). reject can be one of NDARRAY_REJECTIONS and scale one of
+    NDARRAY_SCALES. Values where mask is True are left out.
+    If extremes is given, an unmasked average with minmax rejection reuses the per-pixel "argmin" and "argmax" stack
+    indices in it, or fills them in if it is empty.
+    """
+    with contextlib.ExitStack() as stack:
+        hdus = [stack.enter_context(fts.open(path, memmap=True))[0] for path in paths]
+        header = hdus[0].header.copy()
+        factors = _scale_factors(hdus, scale)
+        # Rejected values are NaN, so only unscaled, unmasked, non sigclip stacks can keep the integer type.
+        native = factors is None and mask is None and reject in ("none", "minmax")
+        dtype = _stack_dtype(hdus) if native else np.dtype(np.float32)
+
+        combined = np.empty(hdus[0].shape, dtype=np.float32)
+        use_extremes = extremes is not None and mask is None and reject == "minmax" and operation == "average"
+        known = use_extremes and "argmin" in extremes
+        if known:
+            argmin, argmax = extremes["argmin"], extremes["argmax"]
+        elif use_extremes:
+            argmin = np.empty(hdus[0].shape, dtype=np.int32)
+            argmax = np.empty(hdus[0].shape, dtype=np.int32)
+
+        def do_slab(y0: int, y1: int) -> None:
+            cube = _stack(hdus, y0, y1, factors, dtype)
+            if use_extremes:
+                if not known:
+                    argmin[y0:y1] = np.argmin(cube, axis=0)
+                    argmax[y0:y1] = np.argmax(cube, axis=0)
+
+                combined[y0:y1] = _minmax_mean(cube, argmin[y0:y1], argmax[y0:y1])
+                return
+
+            if mask is not None:
+                cube[mask[:, y0:y1]] = np.nan
+
+            combined[y0:y1] = _reduce(cube, operation, reject, nan=mask is not None)
+
+        _for_each_slab(hdus, mem_limit, do_slab, dtype.itemsize)
+        if use_extremes and not known:
+            extremes.update(argmin=argmin, argmax=argmax)
+
+    for key in ("BZERO", "BSCALE", "BLANK"):
+        header.remove(key, ignore_missing=True)
+
+    header["NCOMBINE"] = len(paths)
+    write_fits(output, combined, header)
+
+
+def _ndarray_sum(paths: List[str], output: str) -> None:
+    """
+    Sums the images in-process into one accumulator, reading one memory-mapped image at a time. The sum is written in
+    the pixel type of the first image, like IRAF's imsum, so integer sums wrap around the same way.
+    """
+    header, dtype, total = None, None, None
+    for path in paths:
+        with fts.open(path, memmap=True) as hdul:
+            frame = hdul[0].data
+            if total is None:
+                header, dtype = hdul[0].header.copy(), frame.dtype
+                total = np.zeros(frame.shape, dtype=np.int64 if np.issubdtype(dtype, np.integer) else np.float64)
+
+            np.add(total, frame, out=total, casting="unsafe")
+
+    for key in ("BZERO", "BSCALE", "BLANK"):
+        header.remove(key, ignore_missing=True)
+
+    header["NCOMBINE"] = len(paths)
+    write_fits(output, total.astype(dtype), header)
 
 
 class Combine:
-    def __init__(self, fits_array: FitsArray) -> None:
+    def __init__(self, fits_array: FitsArray, use_iraf: bool = False) -> None:
         """
         Constructor method
         Creates a Combine Object.
@@ -18,16 +381,19 @@ class Combine:
         ----------
         fits_array: FitsArray
             A FitsArray.
+        use_iraf: bool, optional
+            Always use IRAF tasks. Otherwise, combines with none, minmax or sigclip rejection and none, median, mean or
+            exposure scaling are done in-process with NumPy.
         """
-        logger.info(f"Creating an instance from {self.__class__.__name__}")
+        logger.info("Creating an instance from %s", self.__class__.__name__)
         if len(fits_array) < 1:
             raise ImageCountError("There is no image to process")
 
         self.fits_array = fits_array
-        iraf.noao(Stdout=PIPE)
-        iraf.imred(Stdout=PIPE)
-        iraf.ccdred(Stdout=PIPE)
-        iraf.imutil(Stdout=PIPE)
+        self.use_iraf = use_iraf
+        self.cr_mask = None
+        self._rejection_cache = {}
+        load_iraf("noao", "imred", "ccdred", "imutil")
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}(id: {id(self)}, fits_array: {self.fits_array})"
@@ -35,31 +401,147 @@ class Combine:
     def __repr__(self) -> str:
         return self.__str__()
 
-    def combine(self, operation: str, output: str = None, override: bool = False, reject: str = None) -> Fits:
+    @classmethod
+    def combine_many(cls, groups: List[Tuple[FitsArray, Dict[str, Any]]], method: str = "combine",
+                     use_iraf: bool = False) -> List[Union[Fits, None]]:
         """
-        Returns the combined Fits of FitsArray.
+        Runs the given combine method on each group in parallel processes.
 
         Parameters
         ----------
-        operation: str
-            Type of operation.
-        output: str, optional
-            path of the new fits file.
-        override: bool, optional
-            Force (overwrite) the output if a file with the same name already exist.
-        reject: str, optional
-            Rejection method.
+        groups: List[Tuple[FitsArray, Dict[str, Any]]]
+            FitsArrays to combine and the parameters of their combine.
+        method: str, optional
+            Name of the combine method. combine|zerocombine|darkcombine|flatcombine|imsum. Default: combine.
+        use_iraf: bool, optional
+            Always use IRAF tasks. See Combine.
 
         Returns
         -------
-        Fits
-            Combined Fits of FitsArray.
+        List[Fits or None]
+            Combined Fits of each group. None for the groups with not enough image.
+        """
+        logger.info("combine_many started. Parameters: groups=%r, method=%r, use_iraf=%r", groups, method, use_iraf)
+        if method not in COMBINE_METHODS:
+            logger.error("Unknown combine method: %r", method)
+            raise ValueError(f"Unknown combine method: {method}")
+
+        if len(groups) < 1:
+            return []
+
+        jobs = [_job(fits_array, method, kwargs, use_iraf) for fits_array, kwargs in groups]
+        with process_pool(len(jobs)) as executor:
+            outputs = list(executor.map(_combine_worker, jobs))
+
+        return [None if output is None else Fits.from_path(output) for output in outputs]
+
+    @classmethod
+    async def combine_all(cls, jobs: List[Tuple[FitsArray, str, Dict[str, Any]]],
+                          use_iraf: bool = False) -> List[Union[Fits, None]]:
+        """
+        Runs the given combines (e.g. a zerocombine, a darkcombine and a flatcombine) concurrently. Each combine runs
+        in its own process, since IRAF's state is process-global and not thread safe.
+
+        Parameters
+        ----------
+        jobs: List[Tuple[FitsArray, str, Dict[str, Any]]]
+            FitsArrays to combine, the name of the combine method and its parameters.
+        use_iraf: bool, optional
+            Always use IRAF tasks. See Combine.
+
+        Returns
+        -------
+        List[Fits or None]
+            Combined Fits of each job. None for the jobs with not enough image.
         """
-        logger.info(f"combine started. Parameters: {operation=}, {output=}, {override=}, {reject=}")
-        Check.operation(operation)
-        Check.rejection(reject)
+        logger.info("combine_all started. Parameters: jobs=%r, use_iraf=%r", jobs, use_iraf)
+        for _, method, _ in jobs:
+            if method not in COMBINE_METHODS:
+                logger.error("Unknown combine method: %r", method)
+                raise ValueError(f"Unknown combine method: {method}")
+
+        if len(jobs) < 1:
+            return []
+
+        loop = asyncio.get_running_loop()
+        with process_pool(len(jobs)) as executor:
+            outputs = await asyncio.gather(*(
+                loop.run_in_executor(executor, _combine_worker, _job(fits_array, method, kwargs, use_iraf))
+                for fits_array, method, kwargs in jobs
+            ))
+
+        return [None if output is None else Fits.from_path(output) for output in outputs]
+
+    def crreject_prepass(self, sigma: float = 5.0, mem_limit: int = MEM_LIMIT) -> np.ndarray:
+        """
+        Flags cosmic rays: values more than sigma robust standard deviations above the median of their pixel through
+        the stack. The mask is kept and left out by the following in-process combines of this object. IRAF combines
+        and imsum cannot use it and warn that it is ignored.
+
+        The mask takes one byte per pixel of every image (number of images * image size bytes) and is allocated
+        whole, on top of mem_limit.
+
+        Parameters
+        ----------
+        sigma: float, optional
+            Threshold in robust standard deviations. Default: 5.
+        mem_limit: int, optional
+            Maximum memory in bytes of the image stack tiles. The returned mask is not counted. Default: 256 MB.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask of cosmic rays with shape (number of images, *image shape).
+        """
+        logger.info("crreject_prepass started. Parameters: sigma=%r, mem_limit=%r", sigma, mem_limit)
+        if len(self.fits_array) < 3:
+            logger.error("Not enough image found")
+            raise ImageCountError("Not enough image found")
+
+        with contextlib.ExitStack() as stack:
+            hdus = [stack.enter_context(fts.open(path, memmap=True))[0] for path in abs(self.fits_array)]
+            mask = np.empty((len(hdus),) + hdus[0].shape, dtype=bool)
+
+            def do_slab(y0: int, y1: int) -> None:
+                mask[:, y0:y1] = _cosmic_rays(_stack(hdus, y0, y1), sigma)
+
+            _for_each_slab(hdus, mem_limit, do_slab)
+
+        self.cr_mask = mask
+        return mask
+
+    def _ignored_mask(self, task_name: str) -> None:
+        """Warns that task_name (an IRAF task or imsum) does not use the cosmic ray mask of crreject_prepass."""
+        if self.cr_mask is None:
+            return
+
+        logger.warning("The cosmic ray mask is ignored by %s. Only in-process combines use it", task_name)
+        warnings.warn(f"The cosmic ray mask is ignored by {task_name}. Only in-process combines use it",
+                      RuntimeWarning)
+
+    def _in_process(self, reject: str, scale: str = None) -> bool:
+        in_process = (not self.use_iraf and Fixer.nonify(reject) in NDARRAY_REJECTIONS
+                      and Fixer.nonify(scale) in NDARRAY_SCALES)
+        if not in_process and scale == "borderpix":
+            logger.error("borderpix scale is only available for in-process combines")
+            raise ScaleValueError("borderpix scale is only available for in-process combines")
+
+        return in_process
+
+    def _do_combine(self, task_name: str, operation: str, output: str = None, override: bool = False,
+                    reject: str = None, scale: str = None, mem_limit: int = MEM_LIMIT) -> Fits:
+        """
+        Runs one of the ccdred combine tasks (combine|zerocombine|darkcombine|flatcombine), in-process if possible.
+        scale is only passed to the IRAF tasks in SCALED_TASKS.
+        """
+        logger.info(
+            "%s started. Parameters: operation=%r, output=%r, override=%r, reject=%r, scale=%r, mem_limit=%r",
+            task_name, operation, output, override, reject, scale, mem_limit
+        )
+        Check.combine_params(operation, reject, scale)
 
         reject = Fixer.nonify(reject)
+        scale = Fixer.nonify(scale)
 
         if (not Check.is_none(reject)) and len(self.fits_array) < 3:
             logger.error("Not enough image found")
@@ -67,53 +549,76 @@ class Combine:
 
         output = Fixer.output(output, override=override, delete=True, prefix="irony_", suffix=".fits")
 
-        iraf.noao.imred.ccdred.combine.unlearn()
-        with self.fits_array.at_file() as at_file:
-            iraf.noao.imred.ccdred.combine(f"'@{at_file}'", output=output, combine=operation, reject=reject, ccdtype="")
+        if self._in_process(reject, scale):
+            _ndarray_combine(abs(self.fits_array), operation, output, reject=reject, scale=scale,
+                             mem_limit=mem_limit, mask=self.cr_mask,
+                             extremes=self._rejection_cache.setdefault(scale, {}))
+            return Fits.from_path(output)
+
+        self._ignored_mask(task_name)
+        kwargs = {"scale": scale, "process": "no"} if task_name in SCALED_TASKS else {}
+        task = _iraf_task(getattr(iraf.noao.imred.ccdred, task_name))
+        with self.fits_array.iraf_input() as images:
+            task(images, output=output, combine=operation, reject=reject, ccdtype="", **kwargs)
 
         return Fits.from_path(output)
 
-    def zerocombine(self, operation: str, output: str = None, override: bool = False, reject: str = None) -> Fits:
+    def combine(self, operation: str, output: str = None, override: bool = False, reject: str = None,
+                mem_limit: int = MEM_LIMIT) -> Fits:
         """
-        Returns the zerocombine Fits of FitsArray.
+        Returns the combined Fits of FitsArray.
 
         Parameters
         ----------
         operation: str
             Type of operation.
         output: str, optional
-            Path of the new fits file.
+            path of the new fits file.
         override: bool, optional
             Force (overwrite) the output if a file with the same name already exist.
         reject: str, optional
             Rejection method.
+        mem_limit: int, optional
+            Maximum memory in bytes of the raw image stack when combining in-process, not counting the temporaries of
+            the reduction. Default: 256 MB.
 
         Returns
         -------
         Fits
             Combined Fits of FitsArray.
         """
-        logger.info(f"zerocombine started. Parameters: {operation=}, {output=}, {override=}, {reject=}")
-        Check.operation(operation)
-        Check.rejection(reject)
-
-        reject = Fixer.nonify(reject)
+        return self._do_combine("combine", operation, output=output, override=override, reject=reject,
+                                mem_limit=mem_limit)
 
-        if (not Check.is_none(reject)) and len(self.fits_array) < 3:
-            logger.error("Not enough image found")
-            raise ImageCountError("Not enough image found")
-
-        output = Fixer.output(output, override=override, delete=True, prefix="irony_", suffix=".fits")
+    def zerocombine(self, operation: str, output: str = None, override: bool = False, reject: str = None,
+                    mem_limit: int = MEM_LIMIT) -> Fits:
+        """
+        Returns the zerocombine Fits of FitsArray.
 
-        iraf.noao.imred.ccdred.zerocombine.unlearn()
-        with self.fits_array.at_file() as at_file:
-            iraf.noao.imred.ccdred.zerocombine(f"'@{at_file}'", output=output, combine=operation, reject=reject,
-                                               ccdtype="")
+        Parameters
+        ----------
+        operation: str
+            Type of operation.
+        output: str, optional
+            Path of the new fits file.
+        override: bool, optional
+            Force (overwrite) the output if a file with the same name already exist.
+        reject: str, optional
+            Rejection method.
+        mem_limit: int, optional
+            Maximum memory in bytes of the raw image stack when combining in-process, not counting the temporaries of
+            the reduction. Default: 256 MB.
 
-        return Fits.from_path(output)
+        Returns
+        -------
+        Fits
+            Combined Fits of FitsArray.
+        """
+        return self._do_combine("zerocombine", operation, output=output, override=override, reject=reject,
+                                mem_limit=mem_limit)
 
     def darkcombine(self, operation: str, output: str = None, override: bool = False, reject: str = None,
-                    scale: str = None) -> Fits:
+                    scale: str = None, mem_limit: int = MEM_LIMIT) -> Fits:
         """
         Returns the darkcombine Fits of FitsArray.
 
@@ -128,38 +633,22 @@ class Combine:
         reject: str, optional
             Rejection method.
         scale: str, optional
-            Scaling method.
+            Scaling method. borderpix scales by the median of the outer border pixels and is only available
+            in-process.
+        mem_limit: int, optional
+            Maximum memory in bytes of the raw image stack when combining in-process, not counting the temporaries of
+            the reduction. Default: 256 MB.
 
         Returns
         -------
         Fits
             Combined Fits of FitsArray.
         """
-        logger.info(
-            f"darkcombine started. Parameters: {operation=}, {output=}, {override=}, {reject=}, {scale=}"
-        )
-        Check.operation(operation)
-        Check.rejection(reject)
-        Check.scale(scale)
-
-        reject = Fixer.nonify(reject)
-        scale = Fixer.nonify(scale)
-
-        if (not Check.is_none(reject)) and len(self.fits_array) < 3:
-            logger.error("Not enough image found")
-            raise ImageCountError("Not enough image found")
-
-        output = Fixer.output(output, override=override, delete=True, prefix="irony_", suffix=".fits")
-
-        iraf.noao.imred.ccdred.darkcombine.unlearn()
-        with self.fits_array.at_file() as at_file:
-            iraf.noao.imred.ccdred.darkcombine(f"'@{at_file}'", output=output, combine=operation, reject=reject,
-                                               scale=scale, ccdtype="", process="no")
-
-        return Fits.from_path(output)
+        return self._do_combine("darkcombine", operation, output=output, override=override, reject=reject, scale=scale,
+                                mem_limit=mem_limit)
 
     def flatcombine(self, operation: str, output: str = None, override: bool = False, reject: str = None,
-                    scale: str = None) -> Fits:
+                    scale: str = None, mem_limit: int = MEM_LIMIT) -> Fits:
         """
         Returns the flatcombine Fits of FitsArray.
 
@@ -174,33 +663,19 @@ class Combine:
         reject: str, optional
             Rejection method.
         scale: str, optional
-            Scaling method.
+            Scaling method. borderpix scales by the median of the outer border pixels and is only available
+            in-process.
+        mem_limit: int, optional
+            Maximum memory in bytes of the raw image stack when combining in-process, not counting the temporaries of
+            the reduction. Default: 256 MB.
 
         Returns
         -------
         Fits
             Combined Fits of FitsArray.
         """
-        logger.info(f"flatcombine started. Parameters: {operation=}, {output=}, {override=}, {reject=}, {scale=}")
-        Check.operation(operation)
-        Check.rejection(reject)
-        Check.scale(scale)
-
-        reject = Fixer.nonify(reject)
-        scale = Fixer.nonify(scale)
-
-        if (not Check.is_none(reject)) and len(self.fits_array) < 3:
-            logger.error("Not enough image found")
-            raise ImageCountError("Not enough image found")
-
-        output = Fixer.output(output, override=override, delete=True, prefix="irony_", suffix=".fits")
-
-        iraf.noao.imred.ccdred.flatcombine.unlearn()
-        with self.fits_array.at_file() as at_file:
-            iraf.noao.imred.ccdred.flatcombine(f"'@{at_file}'", output=output, combine=operation, reject=reject,
-                                               scale=scale, ccdtype="", process="no")
-
-        return Fits.from_path(output)
+        return self._do_combine("flatcombine", operation, output=output, override=override, reject=reject, scale=scale,
+                                mem_limit=mem_limit)
 
     def imsum(self, output: str = None, override: bool = False) -> Fits:
         """
@@ -218,14 +693,19 @@ class Combine:
         Fits
             Sum of FitsArray.
         """
-        logger.info(f"imsum started. Parameters:{output=}, {override=}")
+        logger.info("imsum started. Parameters:output=%r, override=%r", output, override)
         if len(self.fits_array) < 2:
             logger.error("Not enough image found")
             raise ImageCountError("Not enough image found")
 
         output = Fixer.output(output, override=override, delete=True, prefix="irony_", suffix=".fits")
+        self._ignored_mask("imsum")
+
+        if not self.use_iraf:
+            _ndarray_sum(abs(self.fits_array), output)
+            return Fits.from_path(output)
 
-        iraf.imutil.imsum.unlearn()
-        with self.fits_array.at_file() as at_file:
-            iraf.imutil.imsum(f"'@{at_file}'", output=output)
+        task = _iraf_task(iraf.imutil.imsum, "imsum")
+        with self.fits_array.iraf_input() as images:
+            task(images, output=output)
         return Fits.from_path(output)
@@ -1,30 +1,103 @@
 from __future__ import annotations
 
 import contextlib
+import os
+import shutil
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
 from pathlib import Path
-from subprocess import PIPE
-from typing import Dict, List, Union, Hashable
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union, Hashable
 
 import astroalign
 import matplotlib.animation as animation
 import numpy as np
 import pandas as pd
 from astropy.io import fits as fts
-from astropy.stats import sigma_clipped_stats
 from astropy.visualization import ZScaleInterval
 from matplotlib import pyplot as plt
 from mpl_point_clicker import clicker
 from photutils.detection import DAOStarFinder
 from pyraf import iraf
 from sep import Background, extract as sep_extract
+from skimage.transform import warp
 from ccdproc import cosmicray_lacosmic
 
 from .base_logger import logger
 from .errors import AlignError, ImageCountError, NumberOfElementError
-from .utils import Check, Fixer
+from .utils import Check, Fixer, load_iraf, process_pool, sigma_clipped_stats, write_fits
+
+# Longest comma-joined list of paths passed to IRAF directly instead of through an @file. IRAF strings are at most
+# SZ_LINE (1023) characters long.
+IRAF_LIST_LIMIT = 1000
+
+_OPERATORS = {"+": np.add, "-": np.subtract, "*": np.multiply, "/": np.true_divide}
+
+
+def _imarith(path: str, other: Union[str, float, int], operand: str, output: str) -> None:
+    """
+    Applies operand to the image at path and other (a path or a number) and writes the float32 result to output.
+    Division by zero gives 0, like IRAF's imarith (divzero=0).
+    """
+    with contextlib.ExitStack() as stack:
+        hdu = stack.enter_context(fts.open(path, memmap=True))[0]
+        header = hdu.header.copy()
+        if isinstance(other, str):
+            other = stack.enter_context(fts.open(other, memmap=True))[0].data
+            if other.shape != hdu.shape:
+                logger.error(f"Images must have the same shape: {hdu.shape} != {other.shape}")
+                raise ValueError("Images must have the same shape")
+
+        result = np.zeros(hdu.shape, dtype=np.float32)
+        where = np.asarray(other) != 0 if operand == "/" else True
+        _OPERATORS[operand](hdu.data, other, out=result, where=where, dtype=np.float32)
+
+    for key in ("BZERO", "BSCALE", "BLANK"):
+        header.remove(key, ignore_missing=True)
+
+    write_fits(output, result, header)
+
+
+DAOFIND_COLUMNS = ["id", "xcentroid", "ycentroid", "sharpness", "roundness1", "roundness2", "npix", "sky", "peak", "flux",
+                   "mag"]
+
+
+def _daofind(data: np.ndarray, fwhm: float, sigma: float, threshold: float) -> pd.DataFrame:
+    """
+    Runs DAOStarFinder on data with its threshold set to threshold times the sigma clipped std of data. The finder is
+    created through its constructor for each image, since photutils derives its internal thresholds there.
+    """
+    mean, median, std = sigma_clipped_stats(data, sigma=sigma)
+    sources = DAOStarFinder(fwhm=fwhm, threshold=threshold * std)(data - median)
+    if sources is not None:
+        return sources.to_pandas()
+    return pd.DataFrame([], columns=DAOFIND_COLUMNS)
+
+
+def _sep_find(fits: Fits, threshold: float) -> pd.DataFrame:
+    """
+    Detects sources with sep's C extractor on the background subtracted image, threshold times the global background
+    rms above the background.
+    """
+    background = fits.background()
+    objects = sep_extract(fits.data - background.back(), threshold, err=background.globalrms)
+    return pd.DataFrame({
+        "id": np.arange(1, len(objects) + 1), "xcentroid": objects["x"], "ycentroid": objects["y"],
+        "npix": objects["npix"], "peak": objects["peak"], "flux": objects["flux"]
+    })
+
+
+def _align_worker(job: Tuple[str, str, str, Dict[str, Any]]) -> Union[str, None]:
+    """
+    Aligns one image to the reference in a worker process. Returns the path of the aligned image, or None if it could
+    not be aligned.
+    """
+    path, reference, output, kwargs = job
+    try:
+        return abs(Fits.from_path(path).align(Fits.from_path(reference), output, **kwargs))
+    except (astroalign.MaxIterError, AlignError):
+        return None
 
 
 class Fits:
@@ -44,8 +117,14 @@ class Fits:
             raise FileNotFoundError("File does not exist")
 
         self.path = path
+        # Resolved once. abs(fits) is called for every cached access and every IRAF/photometry job.
+        self._absolute = str(path.absolute())
+        self._cache = {}
 
-        iraf.noao(Stdout=PIPE)
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        return state
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}(@: {id(self)}, file: {abs(self)})"
@@ -54,7 +133,7 @@ class Fits:
         return self.__str__()
 
     def __abs__(self) -> str:
-        return str(self.path.absolute())
+        return self._absolute
 
     def __sub__(self, other: Union[Fits, float, int]) -> Fits:
         return self.imarith(other, "-")
@@ -96,10 +175,41 @@ class Fits:
     def file(self):
         return f"{{OBSCURED PATH}}/{str(self.path.stem)}{str(self.path.suffix)}"
 
+    def _cached(self, name: str, compute: Callable[[], Any]) -> Any:
+        """
+        Returns compute() and keeps it until the file changes (by modification time and size), so repeated header,
+        statistics and display limit accesses do not open and parse the file again. Only small derived values are
+        kept, never the pixel data.
+        """
+        stat = os.stat(abs(self))
+        key = (stat.st_mtime_ns, stat.st_size)
+        if name not in self._cache or self._cache[name][0] != key:
+            self._cache[name] = (key, compute())
+
+        return self._cache[name][1]
+
+    @contextlib.contextmanager
+    def _mapped_data(self) -> Iterator[np.ndarray]:
+        """
+        Yields the memory-mapped (read-only, on-disk type) data of the file. The file is closed on exit, so no mapping
+        or file descriptor is kept between calls, however many Fits are in use.
+        """
+        with fts.open(abs(self), memmap=True) as hdul:
+            yield hdul[0].data
+
+    def _raw_header(self) -> fts.Header:
+        """Returns the parsed primary header of the file. Only the primary HDU is read."""
+        def compute() -> fts.Header:
+            with fts.open(abs(self), memmap=False, lazy_load_hdus=True) as hdul:
+                return hdul[0].header
+
+        return self._cached("raw_header", compute)
+
     @property
     def imstat(self) -> dict:
         """
-        Returns the npix, mean, stddev, min, max of the array as a dict. The default return of IRAF's imstatistics task.
+        Returns the npix, mean, stddev, min, max of the array as a dict. The default fields of IRAF's imstatistics task,
+        computed with NumPy.
 
         Returns
         -------
@@ -108,12 +218,14 @@ class Fits:
         """
         logger.info(f"imstat started. Parameters: None")
 
-        iraf.imutil.imstatistics.unlearn()
-        keys = ["npix", "mean", "stddev", "min", "max"]
-        data = [each.split() for each in
-                iraf.imutil.imstatistics(abs(self), fields="image,npix,mean,stddev,min,max", Stdout=PIPE)
-                if not each.startswith("#") and not each.startswith("Error")]
-        return {key: float(value) for key, value in zip(keys, data[0][1:])}
+        def compute() -> dict:
+            with self._mapped_data() as data:
+                return {
+                    "npix": data.size, "mean": float(data.mean()), "stddev": float(data.std()),
+                    "min": float(data.min()), "max": float(data.max())
+                }
+
+        return dict(self._cached("imstat", compute))
 
     @property
     def header(self) -> dict:
@@ -127,26 +239,80 @@ class Fits:
         """
         logger.info(f"Getting header. Parameters: None")
 
-        header = fts.getheader(abs(self))
-        return {i: header[i] for i in header if i}
+        def compute() -> dict:
+            header = self._raw_header()
+            return {i: header[i] for i in header if i}
+
+        return dict(self._cached("header", compute))
 
     @property
     def data(self) -> np.ndarray:
         """
-        Returns the header of the fits file as a np.array.
+        Returns the data of the fits file as a float32 np.array.
+
+        Returns
+        -------
+        np.ndarray
+            array of data.
+        """
+        return self.get_data()
+
+    def get_data(self, dtype: np.dtype = np.float32) -> np.ndarray:
+        """
+        Returns a new np.array of dtype (native byte order) of the data of the fits file. The file is memory-mapped,
+        so the only copy made is the conversion to dtype.
+
+        Parameters
+        ----------
+        dtype: np.dtype, optional
+            Type of the returned array. Default: np.float32.
 
         Returns
         -------
         np.ndarray
             array of data.
         """
-        logger.info(f"Getting data. Parameters: None")
+        logger.info(f"Getting data. Parameters: {dtype=}")
+
+        with self._mapped_data() as data:
+            return np.array(data, dtype=dtype)
+
+    def pixels(self, xs: np.ndarray, ys: np.ndarray, dtype: np.dtype = np.float32) -> np.ndarray:
+        """
+        Returns the values of the given pixels as a np.array of dtype. Only these pixels are read from the memory-mapped
+        file, not the whole data.
+
+        Parameters
+        ----------
+        xs: np.ndarray
+            Integer x (column) coordinates of the pixels.
+        ys: np.ndarray
+            Integer y (row) coordinates of the pixels.
+        dtype: np.dtype, optional
+            Type of the returned array. Default: np.float32.
+
+        Returns
+        -------
+        np.ndarray
+            array of pixel values.
+        """
+        logger.info(f"Getting pixels. Parameters: {dtype=}")
+
+        with self._mapped_data() as data:
+            return np.array(data[ys, xs], dtype=dtype)
+
+    def _zscale_limits(self) -> Tuple[float, float]:
+        """Returns the (vmin, vmax) display limits of ZScaleInterval. They are kept until the file changes."""
+        def compute() -> Tuple[float, float]:
+            with self._mapped_data() as data:
+                return ZScaleInterval().get_limits(data)
 
-        return fts.getdata(abs(self)).astype(float)
+        return self._cached("zscale", compute)
 
     def background(self, as_array: bool = False) -> Union[Background, np.ndarray]:
         """
-        Returns the background object of the fits file.
+        Returns the background object of the fits file. sep needs C-contiguous float32 (or float64) data, which is
+        what data returns. The object is kept until the file changes.
 
         Parameters
         ----------
@@ -160,9 +326,10 @@ class Fits:
         """
         logger.info(f"Getting background. Parameters: {as_array=}")
 
+        background = self._cached("background", lambda: Background(self.data))
         if as_array:
-            return Background(self.data).back()
-        return Background(self.data)
+            return background.back()
+        return background
 
     def cosmic_cleaner(self, output: str = None, override: bool = False, sigclip: float = 4.5, sigfrac: float = 0.3,
                        objlim: float = 5.0, gain: float = 1.0, readnoise: float = 6.5, satlevel: float = 65535.0,
@@ -231,7 +398,7 @@ class Fits:
                                         cleantype=cleantype, fsmode=fsmode, psfmodel=psfmodel, psffwhm=psffwhm,
                                         psfsize=psfsize, psfk=psfk, psfbeta=psfbeta, gain_apply=gain_apply)
 
-        fts.writeto(output, newdata.value, header=fts.getheader(abs(self)))
+        write_fits(output, newdata.value, header=self._raw_header().copy())
 
         return Fits.from_path(output)
 
@@ -262,6 +429,7 @@ class Fits:
             if isinstance(keys, str):
                 keys = [keys]
 
+            self._cache.clear()
             with fts.open(abs(self), "update") as hdu:
                 for key in keys:
                     if key in hdu[0].header:
@@ -284,6 +452,7 @@ class Fits:
                 logger.error(f"List of keys and values must be equal in length")
                 raise ValueError("List of keys and values must be equal in length")
 
+            self._cache.clear()
             with fts.open(abs(self), "update") as hdu:
                 for key, value in zip(keys, values):
                     if value_is_key:
@@ -311,14 +480,16 @@ class Fits:
 
         path = Fixer.output(path, override=override)
 
-        iraf.imutil.imcopy.unlearn()
-        iraf.imutil.imcopy(abs(self), path, verbose="no")
+        # A plain file copy. The kernel copies the bytes (copy_file_range/sendfile) without passing them through Python.
+        shutil.copyfile(abs(self), path)
 
         return Fits.from_path(path)
 
-    def imarith(self, other: Union[Fits, float, int], operand: str, output: str = None, override: bool = False) -> Fits:
+    def imarith(self, other: Union[Fits, float, int], operand: str, output: str = None, override: bool = False,
+                use_iraf: bool = False) -> Fits:
         """
-        Makes an arithmeic calculation on the file. The default behaviour of IRAF's imarith task.
+        Makes an arithmeic calculation on the file. The default behaviour of IRAF's imarith task. The result is
+        calculated with NumPy as float32 unless use_iraf is True.
 
         Parameters
         ----------
@@ -330,13 +501,15 @@ class Fits:
             Path of the new fits file.
         override: bool, optional
             If True will overwrite the new_path if a file is already exists.
+        use_iraf: bool, optional
+            Use IRAF's imarith task.
 
         Returns
         -------
         Fits
             Fits object of resulting fits of the operation.
         """
-        logger.info(f"imarith started. Parameters: {other=}, {operand=}, {output=}, {override=}")
+        logger.info(f"imarith started. Parameters: {other=}, {operand=}, {output=}, {override=}, {use_iraf=}")
 
         if not isinstance(other, (float, int, Fits)):
             logger.error(f"Please provide either a Fits Object or a numeric value")
@@ -349,6 +522,11 @@ class Fits:
         if isinstance(other, Fits):
             other = abs(other)
 
+        if not use_iraf:
+            _imarith(abs(self), other, operand, output)
+            return Fits.from_path(output)
+
+        load_iraf("noao")
         iraf.imutil.imarith.unlearn()
         iraf.imutil.imarith(operand1=abs(self), op=operand, operand2=other, result=output)
 
@@ -384,7 +562,8 @@ class Fits:
                      "peak", "xcpeak", "ycpeak", "xpeak", "ypeak", "flag"]
         )
 
-    def daofind(self, sigma: float = 3, fwhm: float = 3, threshold: float = 5) -> pd.DataFrame:
+    def daofind(self, sigma: float = 3, fwhm: float = 3, threshold: float = 5,
+                backend: str = "photutils") -> pd.DataFrame:
         """
         Runs daofind to detect sources on the image.
 
@@ -400,6 +579,9 @@ class Fits:
             The full-width half-maximum (FWHM) of the major axis of the Gaussian kernel in units of pixels. [2]
         threshold: float, optional
             The absolute image value above which to select sources. [2]
+        backend: str, optional
+            photutils (DAOStarFinder) or sep. sep's C extractor is much faster, ignores sigma and fwhm, and returns
+            only id, xcentroid, ycentroid, npix, peak and flux. threshold is then in units of the background rms.
 
         Returns
         -------
@@ -407,16 +589,16 @@ class Fits:
             List of sources found on the image.
         """
         logger.info(
-            f"daofind started. Parameters: {sigma=}, {fwhm=}, {threshold=}")
+            f"daofind started. Parameters: {sigma=}, {fwhm=}, {threshold=}, {backend=}")
+
+        if backend == "sep":
+            return _sep_find(self, threshold)
 
-        mean, median, std = sigma_clipped_stats(self.data, sigma=sigma)
-        daofind = DAOStarFinder(fwhm=fwhm, threshold=threshold * std)
-        sources = daofind(self.data - median)
-        if sources is not None:
-            return sources.to_pandas()
-        return pd.DataFrame([],
-                            columns=["id", "xcentroid", "ycentroid", "sharpness", "roundness1", "roundness2", "npix",
-                                     "sky", "peak", "flux", "mag"])
+        if backend != "photutils":
+            logger.error(f"Unknown backend: {backend}")
+            raise ValueError(f"Unknown backend: {backend}")
+
+        return _daofind(self.data, fwhm, sigma, threshold)
 
     def align(self, other: Fits, output: str = None, max_control_points: int = 50, detection_sigma: float = 5,
               min_area: int = 5, override: bool = False) -> Fits:
@@ -454,10 +636,13 @@ class Fits:
 
         output = Fixer.output(output, override=override)
         try:
-            registered_image, footprint = astroalign.register(self.data, other.data,
-                                                              max_control_points=max_control_points,
-                                                              detection_sigma=detection_sigma, min_area=min_area)
-            fts.writeto(output, registered_image, header=fts.getheader(abs(self)))
+            source, target = self.data, other.data
+            transform, _ = astroalign.find_transform(source, target, max_control_points=max_control_points,
+                                                     detection_sigma=detection_sigma, min_area=min_area)
+            # The warp astroalign.register does, without also warping the footprint image which is not used.
+            registered_image = warp(source, inverse_map=transform.inverse, output_shape=target.shape, order=3,
+                                    mode="constant", cval=np.median(source), clip=True, preserve_range=True)
+            write_fits(output, registered_image.astype(np.float32, copy=False), header=self._raw_header().copy())
             return Fits.from_path(output)
         except ValueError:
             logger.error("Cannot align two images")
@@ -481,13 +666,8 @@ class Fits:
         """
         logger.info(f"showing image. Parameters: {points=}, {scale=}")
 
-        if scale:
-            zscale = ZScaleInterval()
-        else:
-
-            def zscale(x): return x
-
-        plt.imshow(zscale(self.data), cmap="Greys_r")
+        vmin, vmax = self._zscale_limits() if scale else (None, None)
+        plt.imshow(self.data, cmap="Greys_r", vmin=vmin, vmax=vmax)
         if points is not None:
             plt.scatter(points.xcentroid, points.ycentroid, s=10, c="red")
         plt.xticks([])
@@ -567,15 +747,9 @@ class Fits:
         pd.DataFrame
             List of coordinates selected.
         """
-        if scale:
-            zscale = ZScaleInterval()
-        else:
-
-            def zscale(x):
-                return x
-
+        vmin, vmax = self._zscale_limits() if scale else (None, None)
         fig, ax = plt.subplots(constrained_layout=True)
-        ax.imshow(zscale(self.data), cmap="Greys_r")
+        ax.imshow(self.data, cmap="Greys_r", vmin=vmin, vmax=vmax)
         klkr = clicker(ax, ["source"], markers=["o"])
         plt.show()
         if len(klkr.get_positions()["source"]) == 0:
@@ -612,6 +786,16 @@ class FitsArray:
             raise ImageCountError("No image was provided")
 
         self.fits_list = fits_list
+        self._at_file = None
+        self._at_file_key = None
+        self._cache = {}
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_at_file"] = None
+        state["_at_file_key"] = None
+        state["_cache"] = {}
+        return state
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}(@: {id(self)}, nof: {len(self)})"
@@ -638,14 +822,14 @@ class FitsArray:
         return list(map(abs, self.fits_list))
 
     @classmethod
-    def from_paths(cls, paths: List[str]) -> FitsArray:
+    def from_paths(cls, paths: Iterable[str]) -> FitsArray:
         """
         Creates a FitsArray Object. The length of glob('file_path*.fit*') must be larger then 0.
 
         Parameters
         ----------
-        paths: List[str]
-            A list of strings of paths.
+        paths: Iterable[str]
+            A list (or any iterable, e.g. an open file of one path per line) of strings of paths.
 
         Returns
         -------
@@ -653,12 +837,20 @@ class FitsArray:
             FitsArray generated from list of paths as str.
         """
         logger.info(f"Creating FitsArray from from_paths. Parameters: {paths}")
-        files = []
-        for each in map(Path, paths):
+        paths = [each.strip() if isinstance(each, str) else each for each in paths]
+        paths = [Path(each) for each in paths if each != ""]
+
+        def create(path: Path) -> Union[Fits, None]:
             try:
-                files.append(Fits(each))
+                return Fits(path)
             except FileNotFoundError:
-                pass
+                return None
+
+        # Each Fits stats its file. On network file systems the stats are latency bound, so they overlap in threads.
+        files = []
+        if paths:
+            with ThreadPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as executor:
+                files = [fits for fits in executor.map(create, paths) if fits is not None]
 
         return FitsArray(files)
 
@@ -686,6 +878,7 @@ class FitsArray:
     def at_file(self) -> str:
         """
         Creates a text file with all fits file paths at each line. Useful for IRAF's @files.
+        The file is kept and reused until the list of files changes.
 
         Returns
         -------
@@ -694,23 +887,59 @@ class FitsArray:
         """
         logger.info(f"Creating at_file. Parameters: None")
 
-        with tempfile.NamedTemporaryFile(mode="w", delete=True, suffix=".fls", prefix="irony_") as tmp:
-            to_write = []
-            for each in self.fits_list:
-                to_write.append(abs(each))
-            tmp.write("\n".join(to_write))
+        paths = abs(self)
+        key = hash(tuple(paths))
+        if self._at_file is None or self._at_file_key != key:
+            if self._at_file is not None:
+                self._at_file.close()
+
+            tmp = tempfile.NamedTemporaryFile(mode="w", delete=True, suffix=".fls", prefix="irony_")
+            tmp.write("\n".join(paths))
             tmp.flush()
-            yield tmp.name
+            self._at_file, self._at_file_key = tmp, key
+
+        yield self._at_file.name
+
+    @contextlib.contextmanager
+    def iraf_input(self) -> str:
+        """
+        Returns the list of files as an IRAF input parameter. Short lists are passed as comma-joined paths, so no at_file
+        is written. Longer lists (or paths with commas) use at_file.
+
+        Returns
+        -------
+        str
+            A context manager of the quoted IRAF input parameter.
+        """
+        paths = abs(self)
+        joined = ",".join(paths)
+        if len(joined) <= IRAF_LIST_LIMIT and not any("," in path for path in paths):
+            yield f"'{joined}'"
+        else:
+            with self.at_file() as at_file:
+                yield f"'@{at_file}'"
 
     @property
     def files(self):
         return [fits.file for fits in self.fits_list]
 
+    def _cached(self, name: str, compute: Callable[[], Any]) -> Any:
+        """
+        Returns compute() and keeps it until the list of files or any of the files changes (by modification time and
+        size), like Fits does for a single file.
+        """
+        stats = [(path, os.stat(path)) for path in abs(self)]
+        key = tuple((path, stat.st_mtime_ns, stat.st_size) for path, stat in stats)
+        if name not in self._cache or self._cache[name][0] != key:
+            self._cache[name] = (key, compute())
+
+        return self._cache[name][1]
+
     @property
     def imstat(self) -> pd.DataFrame:
         """
-        Returns the npix, mean, stddev, min, max of the array as a pd.DataFrame. The default return of
-        IRAF's imstatistics task.
+        Returns the npix, mean, stddev, min, max of the array as a pd.DataFrame. The default fields of
+        IRAF's imstatistics task, computed with NumPy for each file in parallel threads.
 
         Returns
         -------
@@ -719,14 +948,23 @@ class FitsArray:
         """
         logger.info(f"imstat started. Parameters: None")
 
-        iraf.imutil.imstatistics.unlearn()
-        with self.at_file() as at_file:
-            return (pd.DataFrame([each.split() for each in
-                                  iraf.imutil.imstatistics(f"@{at_file}", fields="image,npix,mean,stddev,min,max",
-                                                           Stdout=PIPE) if
-                                  not each.startswith("#") and not each.startswith("Error")],
-                                 columns=("image", "npix", "mean", "stddev", "min", "max")).set_index("image").replace(
-                {np.nan: None}).astype(float))
+        def compute() -> pd.DataFrame:
+            with ThreadPoolExecutor(max_workers=min(len(self), os.cpu_count() or 1)) as executor:
+                stats = list(executor.map(lambda fits: fits.imstat, self))
+
+            # Typed columns straight from the stats, no intermediate object frame to cast afterwards.
+            columns = {"npix": np.array([each["npix"] for each in stats], dtype=np.int64)}
+            for key in ("mean", "stddev", "min", "max"):
+                columns[key] = np.array([each[key] for each in stats], dtype=np.float64)
+
+            return pd.DataFrame(columns, index=pd.Index([abs(each) for each in self], name="image"))
+
+        return self._cached("imstat", compute).copy()
+
+    def _headers(self) -> List[dict]:
+        """Returns the header dict of each file, read in parallel threads. Fits keeps each until its file changes."""
+        with ThreadPoolExecutor(max_workers=min(len(self), os.cpu_count() or 1)) as executor:
+            return list(executor.map(lambda fits: fits.header, self))
 
     @property
     def header(self) -> pd.DataFrame:
@@ -740,13 +978,20 @@ class FitsArray:
         """
         logger.info(f"getting header. Parameters: None")
 
-        headers = []
-        for each in self:
-            h = each.header
-            h["image"] = str(abs(each))
-            headers.append(h)
+        def compute() -> pd.DataFrame:
+            headers = self._headers()
 
-        return pd.DataFrame(headers).set_index("image").replace({np.nan: None})
+            # One column list per key (in order of first appearance), so pandas does not have to align N dicts.
+            keys = dict.fromkeys(key for h in headers for key in h)
+            columns = {key: [None] * len(headers) for key in keys}
+            for i, h in enumerate(headers):
+                for key, value in h.items():
+                    columns[key][i] = value
+
+            index = pd.Index([str(abs(fits)) for fits in self], name="image")
+            return pd.DataFrame(columns, index=index).replace({np.nan: None})
+
+        return self._cached("header", compute).copy()
 
     def hedit(self, keys: Union[str, List[str]], values: Union[str, List[str]] = None, delete: bool = False,
               value_is_key: bool = False) -> None:
@@ -771,36 +1016,124 @@ class FitsArray:
         """
         logger.info(f"hedit started. Parameters: {keys=}, {values=}, {delete=}, {value_is_key=}")
 
+        self.hedit_batch([{"keys": keys, "values": values, "delete": delete, "value_is_key": value_is_key}])
+
+    @staticmethod
+    def _hedit_params(keys: Union[str, List[str]], values: Union[str, List[str]] = None, delete: bool = False,
+                      value_is_key: bool = False) -> Tuple[List[str], List[str], bool, bool]:
+        """Validates the parameters of one hedit and returns them with keys and values as lists."""
         if delete:
-            if isinstance(keys, str):
-                keys = [keys]
-            for fits in self:
-                with fts.open(abs(fits), "update") as hdu:
-                    for key in keys:
-                        if key in hdu[0].header:
-                            del hdu[0].header[key]
-                        else:
-                            logger.warning(f"{key} was not found in header. Skipping for {abs(fits)}")
-        else:
-            if not isinstance(keys, type(values)):
-                logger.error(f"keys and values must both be strings or list of strings")
-                raise ValueError("keys and values must both be strings or list of strings")
+            return [keys] if isinstance(keys, str) else keys, [], True, False
 
-            if isinstance(keys, str):
-                keys = [keys]
-                values = [values]
+        if not isinstance(keys, type(values)):
+            logger.error(f"keys and values must both be strings or list of strings")
+            raise ValueError("keys and values must both be strings or list of strings")
 
-            if len(keys) != len(values):
-                logger.error(f"List of keys and values must be equal in length")
-                raise ValueError("List of keys and values must be equal in length")
+        if isinstance(keys, str):
+            keys = [keys]
+            values = [values]
+
+        if len(keys) != len(values):
+            logger.error(f"List of keys and values must be equal in length")
+            raise ValueError("List of keys and values must be equal in length")
 
-            for fits in self:
-                with fts.open(abs(fits), "update") as hdu:
-                    for key, value in zip(keys, values):
-                        if value_is_key:
-                            hdu[0].header[key] = hdu[0].header[value]
-                        else:
-                            hdu[0].header[key] = value
+        return keys, values, False, value_is_key
+
+    def hedit_batch(self, edits: List[Dict[str, Any]]) -> None:
+        """
+        Applies several hedits at once. Each file is opened and flushed only once for all edits, and files are updated
+        in parallel threads. Only the header is read, and it is rewritten in place unless it grows.
+
+        Parameters
+        ----------
+        edits: List[Dict[str, Any]]
+            Parameters of each edit, in order, as accepted by hedit: keys, values, delete and value_is_key.
+
+        Returns
+        -------
+        None
+            None.
+        """
+        logger.info(f"hedit_batch started. Parameters: {edits=}")
+
+        edits = [self._hedit_params(**edit) for edit in edits]
+        if len(edits) < 1:
+            return
+
+        self._cache.clear()
+
+        def edit_one(fits: Fits) -> None:
+            fits._cache.clear()
+            with fts.open(abs(fits), "update", memmap=False) as hdu:
+                header = hdu[0].header
+                for keys, values, delete, value_is_key in edits:
+                    if delete:
+                        for key in keys:
+                            if key in header:
+                                del header[key]
+                            else:
+                                logger.warning(f"{key} was not found in header. Skipping for {abs(fits)}")
+                    else:
+                        for key, value in zip(keys, values):
+                            header[key] = header[value] if value_is_key else value
+
+        with ThreadPoolExecutor(max_workers=min(len(self), os.cpu_count() or 1)) as executor:
+            list(executor.map(edit_one, self))
+
+    def hedit_many(self, key: str, values: List[Union[str, float]]) -> None:
+        """
+        Sets the key in header of each file to its corresponding value. Each file is opened only once.
+
+        Parameters
+        ----------
+        key: str
+            Key to be altered.
+        values: List[Union[str, float]]
+            Values to be set. One value for each file in the FitsArray. Numbers are stored as numeric header values.
+
+        Returns
+        -------
+        None
+            None.
+        """
+        logger.info(f"hedit_many started. Parameters: {key=}, {values=}")
+
+        self.hedit_columns({key: values})
+
+    def hedit_columns(self, updates: Dict[str, List[Union[str, float]]]) -> None:
+        """
+        Sets each key in header of each file to its corresponding value. Each file is opened and flushed only once for
+        all keys. Files are updated in parallel threads.
+
+        Parameters
+        ----------
+        updates: Dict[str, List[Union[str, float]]]
+            Keys to be altered and their values. One value for each file in the FitsArray.
+
+        Returns
+        -------
+        None
+            None.
+        """
+        logger.info(f"hedit_columns started. Parameters: {updates=}")
+
+        if any(len(values) != len(self) for values in updates.values()):
+            logger.error(f"List of values and FitsArray must be equal in length")
+            raise ValueError("List of values and FitsArray must be equal in length")
+
+        if len(updates) < 1:
+            return
+
+        self._cache.clear()
+
+        def write_one(i: int) -> None:
+            self[i]._cache.clear()
+            with fts.open(abs(self[i]), "update", memmap=False) as hdu:
+                for key, values in updates.items():
+                    hdu[0].header[key] = values[i]
+
+        with ThreadPoolExecutor(max_workers=min(len(self), os.cpu_count() or 1)) as executor:
+            list(executor.map(write_one, range(len(self))))
 
     def hselect(self, fields: Union[str, List[str]]) -> pd.DataFrame:
         """
@@ -822,22 +1155,27 @@ class FitsArray:
             fields = [fields]
 
         fields_to_use = []
-        headers = self.header
+        headers = self._headers()
 
         for field in fields:
-            if field in headers.columns:
+            if any(field in header for header in headers):
                 fields_to_use.append(field)
             else:
                 logger.warning(f"{field} was not found in header. Skipping...")
 
         if len(fields_to_use) < 1:
             return pd.DataFrame()
-        return self.header[fields_to_use]
+
+        # Only the selected keys are taken from the (cached) headers, instead of building the frame of every key.
+        columns = {field: [header.get(field) for header in headers] for field in fields_to_use}
+        index = pd.Index([str(abs(fits)) for fits in self], name="image")
+        return pd.DataFrame(columns, index=index).replace({np.nan: None})
 
     def imarith(self, other: Union[FitsArray, Fits, float, int, List[float], List[int]], operand: str,
-                output: str = None) -> FitsArray:
+                output: str = None, use_iraf: bool = False) -> FitsArray:
         """
-        Makes an arithmeic calculation on the file(s). The default behaviour of IRAF's imarith task.
+        Makes an arithmeic calculation on the file(s). The default behaviour of IRAF's imarith task. The results are
+        calculated with NumPy as float32, in parallel threads, unless use_iraf is True.
 
         Parameters
         ----------
@@ -847,13 +1185,15 @@ class FitsArray:
             An arithmetic operator. Either +, -, * or /.
         output: str, optional
             Path of the new fits files.
+        use_iraf: bool, optional
+            Use IRAF's imarith task.
 
         Returns
         -------
         FitsArray
             FitsArray object of resulting fits of the operation.
         """
-        logger.info(f"imarith started. Parameters: {other=}, {operand=}, {output=}")
+        logger.info(f"imarith started. Parameters: {other=}, {operand=}, {output=}, {use_iraf=}")
 
         if not isinstance(other, (float, int, FitsArray, Fits, List)):
             logger.error(f"Please provide either a FitsArray Object, Fits Object or a numeric value")
@@ -861,6 +1201,25 @@ class FitsArray:
 
         Check.operand(operand)
 
+        if not use_iraf:
+            if isinstance(other, (Fits, float, int)):
+                others = [abs(other) if isinstance(other, Fits) else other] * len(self)
+            elif isinstance(other, FitsArray):
+                others = abs(other)
+            else:
+                others = list(other)
+
+            if len(others) != len(self):
+                logger.error("other must have the same length as the FitsArray")
+                raise ValueError("other must have the same length as the FitsArray")
+
+            new_paths = Fixer.new_paths(output, self)
+            with ThreadPoolExecutor(max_workers=min(len(self), os.cpu_count() or 1)) as executor:
+                list(executor.map(_imarith, abs(self), others, [operand] * len(self), new_paths))
+
+            return FitsArray.from_paths(new_paths)
+
+        load_iraf("noao")
         iraf.imutil.imarith.unlearn()
         with self.at_file() as self_at:
             with Fixer.to_new_directory(output, self) as new_at:
@@ -880,12 +1239,55 @@ class FitsArray:
                                                 result=f"'@{new_at}'", verbose="no")
 
                 with open(new_at, "r") as new_files:
-                    return FitsArray.from_paths(new_files.read().split())
+                    return FitsArray.from_paths(new_files)
+
+    def daofind(self, sigma: float = 3, fwhm: float = 3, threshold: float = 5,
+                backend: str = "photutils") -> pd.DataFrame:
+        """
+        Runs daofind to detect sources on each image. The DAOStarFinder (and its kernel) is built once for all images
+        and the images are processed in parallel threads.
+
+        [1]: https://docs.astropy.org/en/stable/api/astropy.stats.sigma_clipped_stats.html
+
+        [2]: https://photutils.readthedocs.io/en/stable/api/photutils.detection.DAOStarFinder.html
+
+        Parameters
+        ----------
+        sigma: float, optional
+            The number of standard deviations to use for both the lower and upper clipping limit. The default is 3. [1]
+        fwhm: float, optional
+            The full-width half-maximum (FWHM) of the major axis of the Gaussian kernel in units of pixels. [2]
+        threshold: float, optional
+            The absolute image value above which to select sources. [2]
+        backend: str, optional
+            photutils (DAOStarFinder) or sep. sep's C extractor is much faster, ignores sigma and fwhm, and returns
+            only id, xcentroid, ycentroid, npix, peak and flux. threshold is then in units of the background rms.
+
+        Returns
+        -------
+        pd.DataFrame
+            List of sources found on all images with the path of their image in the image column.
+        """
+        logger.info(f"daofind started. Parameters: {sigma=}, {fwhm=}, {threshold=}, {backend=}")
+
+        if backend not in ("photutils", "sep"):
+            logger.error(f"Unknown backend: {backend}")
+            raise ValueError(f"Unknown backend: {backend}")
+
+        def find_one(fits: Fits) -> pd.DataFrame:
+            if backend == "sep":
+                return _sep_find(fits, threshold).assign(image=abs(fits))
+            return _daofind(fits.data, fwhm, sigma, threshold).assign(image=abs(fits))
+
+        with ThreadPoolExecutor(max_workers=min(len(self), os.cpu_count() or 1)) as executor:
+            sources = list(executor.map(find_one, self))
+
+        return pd.concat(sources, ignore_index=True)
 
     def align(self, other: Fits, output: str = None, max_control_points: int = 50, detection_sigma: float = 5,
               min_area: int = 5) -> FitsArray:
         """
-        Runs a FitsArray object of aligned Image.
+        Runs a FitsArray object of aligned Image. The images are aligned in parallel processes.
 
         [1]: https://astroalign.quatrope.org/en/latest/api.html#astroalign.register
 
@@ -914,23 +1316,15 @@ class FitsArray:
             logger.error("Other must be a Fits")
             raise ValueError("Other must be a Fits")
 
-        with Fixer.to_new_directory(output, self) as new_files:
-            with open(new_files, "r") as f2r:
-                aligned_files = []
-                new_files = f2r.readlines()
-                for fits, new_file in zip(self, new_files):
-                    try:
-                        new_fits = fits.align(other, new_file.strip(), max_control_points=max_control_points,
-                                              detection_sigma=detection_sigma, min_area=min_area)
-                        aligned_files.append(abs(new_fits))
-                    except astroalign.MaxIterError:
-                        pass
-                    except AlignError:
-                        pass
-            if len(aligned_files) < 1:
-                logger.error(f"None of the input images could be aligned")
-                raise ImageCountError("None of the input images could be aligned")
-            return FitsArray.from_paths(aligned_files)
+        kwargs = {"max_control_points": max_control_points, "detection_sigma": detection_sigma, "min_area": min_area}
+        jobs = [(abs(fits), abs(other), new_file, kwargs) for fits, new_file in zip(self, Fixer.new_paths(output, self))]
+        with process_pool(len(jobs)) as executor:
+            aligned_files = [aligned for aligned in executor.map(_align_worker, jobs) if aligned is not None]
+
+        if len(aligned_files) < 1:
+            logger.error(f"None of the input images could be aligned")
+            raise ImageCountError("None of the input images could be aligned")
+        return FitsArray.from_paths(aligned_files)
 
     def cosmic_cleaner(self, output: str = None, override: bool = False, sigclip: float = 4.5, sigfrac: float = 0.3,
                        objlim: float = 5.0, gain: float = 1.0, readnoise: float = 6.5, satlevel: float = 65535.0,
@@ -1033,19 +1427,26 @@ class FitsArray:
 
         fig = plt.figure()
 
-        if scale:
-            zscale = ZScaleInterval()
-        else:
+        # Each frame is read once, on its first show, and reused on every loop of the animation. Scaling only sets the
+        # color limits of the frame, so no scaled copy of the data is made.
+        frames = [None] * len(self)
 
-            def zscale(x):
-                return x
+        def frame(i: int) -> np.ndarray:
+            if frames[i] is None:
+                frames[i] = self[i].data
+            return frames[i]
 
-        im = plt.imshow(zscale(self[0].data), cmap="Greys_r", animated=True)
+        im = plt.imshow(frame(0), cmap="Greys_r", animated=True)
+        if scale:
+            im.set_clim(*self[0]._zscale_limits())
         plt.xticks([])
         plt.yticks([])
 
         def updatefig(args):
-            im.set_array(zscale(self[args % len(self)].data))
+            i = args % len(self)
+            im.set_array(frame(i))
+            if scale:
+                im.set_clim(*self[i]._zscale_limits())
             return im,
 
         _ = animation.FuncAnimation(fig, updatefig, interval=interval, blit=True)
@@ -1073,16 +1474,13 @@ class FitsArray:
         if len(groups) < 1:
             return dict()
 
-        headers = self.header
-        for group in groups:
-            if group not in headers.columns:
-                headers[group] = "N/A"
+        # Only the grouped keys are taken from the (cached) headers, and the groups reuse the Fits objects of self.
+        headers = self._headers()
 
-        grouped = {}
-        for keys, df in headers.fillna("N/A").groupby(groups, dropna=False):
-            grouped[keys] = FitsArray.from_paths(df.index.tolist())
+        keys_frame = pd.DataFrame({group: [header.get(group) for header in headers] for group in groups})
 
-        return grouped
+        indices = keys_frame.fillna("N/A").groupby(groups, dropna=False).indices
+        return {keys: FitsArray([self.fits_list[i] for i in positions]) for keys, positions in indices.items()}
 
     def save_as(self, output: str) -> FitsArray:
         """
@@ -1099,10 +1497,14 @@ class FitsArray:
             New FitsArray object of saved fits files.
         """
         logger.info(f"saving as. Parameters: {output=}")
-        with self.at_file() as self_at:
-            with Fixer.to_new_directory(output, self) as new_at:
-                iraf.imutil.imcopy.unlearn()
-                iraf.imutil.imcopy(f"'@{self_at}'", f"'@{new_at}'", verbose="no")
 
-                with open(new_at, "r") as new_files:
-                    return FitsArray.from_paths(new_files.read().split())
+        new_paths = Fixer.new_paths(output, self)
+        for new_path in new_paths:
+            if Path(new_path).exists():
+                logger.error(f"{new_path} already exist")
+                raise FileExistsError("File already exist")
+
+        for fits, new_path in zip(self, new_paths):
+            shutil.copyfile(abs(fits), new_path)
+
+        return FitsArray.from_paths(new_paths)
@@ -1,20 +1,134 @@
 from __future__ import annotations
 
+import io
 import math
 from subprocess import PIPE
-from typing import Tuple, Union
+from typing import Iterable, List, Tuple, Union
 
 import numpy as np
 import pandas as pd
 from photutils.aperture import (CircularAnnulus, CircularAperture, aperture_photometry)
-from photutils.utils import calc_total_error
 from pyraf import iraf
 from sep import sum_circle
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 from .base_logger import logger
 from .errors import NumberOfElementError
-from .fits import FitsArray
-from .utils import Fixer
+from .fits import Fits, FitsArray
+from .utils import Fixer, load_iraf, process_pool
+
+PHOT_COLUMNS = ["xcentroid", "ycentroid", "mag", "merr", "flux", "ferr", "SNR"]
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _flux2mag_kernel(flux: np.ndarray, flux_error: np.ndarray, offset: float, mag: np.ndarray,
+                         merr: np.ndarray) -> None:
+        """Numba version of _flux2mag. Fills mag and merr in one pass without temporary arrays."""
+        for i in range(flux.size):
+            mag[i] = offset - 2.5 * np.log10(flux[i])
+            merr[i] = 0.0
+            if flux_error[i] > 0:
+                error = np.sqrt(flux[i] / flux_error[i])
+                if not np.isinf(error):
+                    merr[i] = error
+
+
+def _flux2mag(flux: np.ndarray, flux_error: np.ndarray, exptime: float, zmag: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the magnitudes and magnitude errors of the fluxes. Uses a compiled kernel if numba is installed."""
+    logger.info(f"Converting to mag from flux. Parameters: {exptime=}, {zmag=}")
+
+    # The zero point and exposure correction are the same for every source, so they are added as one constant.
+    offset = zmag + (0.0 if exptime == 0 else 2.5 * math.log10(exptime))
+    if njit is not None:
+        mag, merr = np.empty_like(flux), np.empty_like(flux)
+        _flux2mag_kernel(flux, flux_error, float(offset), mag, merr)
+        return mag, merr
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mag = offset - 2.5 * np.log10(flux)
+        merr = np.where(flux_error > 0, np.sqrt(flux / flux_error), 0.0)
+
+    merr[np.isinf(merr)] = 0
+    return mag, merr
+
+
+def _table(fits: Fits, data: np.ndarray, exptime: float, zmag: float, x: np.ndarray, y: np.ndarray,
+           flux: np.ndarray, flux_error: np.ndarray) -> np.ndarray:
+    """Returns the photometric result of all sources of one image as a (sources, PHOT_COLUMNS) array."""
+    table = np.empty((len(x), len(PHOT_COLUMNS)))
+    table[:, 0], table[:, 1], table[:, 4], table[:, 5] = x, y, flux, flux_error
+    table[:, 2], table[:, 3] = _flux2mag(table[:, 4], table[:, 5], exptime, zmag)
+
+    # Images are indexed [row (y), column (x)].
+    ix, iy = table[:, 0].astype(int), table[:, 1].astype(int)
+    value = data[iy, ix] - fits.background().rms()[iy, ix]
+    with np.errstate(invalid="ignore"):
+        table[:, 6] = np.where(value < 0, np.nan, np.sqrt(value))
+
+    return table
+
+
+def _concat_tables(images: List[str], tables: Iterable[np.ndarray]) -> pd.DataFrame:
+    """Returns one pd.DataFrame of the tables of _table of each image, filled into a single preallocated array."""
+    tables = list(tables)
+    numeric = np.empty((sum(len(table) for table in tables), len(PHOT_COLUMNS)))
+    index = np.empty(len(numeric), dtype=object)
+    start = 0
+    for image, table in zip(images, tables):
+        numeric[start:start + len(table)] = table
+        index[start:start + len(table)] = image
+        start += len(table)
+
+    return pd.DataFrame(numeric, columns=PHOT_COLUMNS, index=pd.Index(index, name="image"), copy=False)
+
+
+def _total_error(data: np.ndarray, bkg_error: np.ndarray, effective_gain: float) -> np.ndarray:
+    """
+    photutils' calc_total_error, sqrt(bkg_error ** 2 + max(data / effective_gain, 0)), computed in one float32 array
+    instead of an intermediate array per operation.
+    """
+    if effective_gain <= 0:
+        raise ValueError("effective_gain must be strictly positive everywhere.")
+
+    error = np.divide(data, effective_gain, dtype=np.float32)
+    np.maximum(error, 0, out=error)
+    error += np.square(bkg_error, dtype=np.float32)
+    return np.sqrt(error, out=error)
+
+
+def _photutils_frame(job: Tuple[str, Union[CircularAperture, CircularAnnulus], float, bool]) -> np.ndarray:
+    """Runs photutils photometry on one image. Module level, so it can run in a worker process."""
+    path, aperture, zmag, compute_errors = job
+    fits = Fits.from_path(path)
+    data = fits.data
+    exptime = fits.header["EXPTIME"]
+    error = _total_error(data, fits.background(as_array=True), exptime) if compute_errors else None
+    phot_table = aperture_photometry(data, aperture, error=error)
+    flux_error = phot_table["aperture_sum_err"] if compute_errors else np.zeros(len(phot_table))
+    return _table(fits, data, exptime, zmag, phot_table["xcenter"].value, phot_table["ycenter"].value,
+                  phot_table["aperture_sum"], flux_error)
+
+
+def _sep_frame(job: Tuple[str, np.ndarray, np.ndarray, float, Tuple[float, float], float]) -> np.ndarray:
+    """Runs sep photometry on one image. Module level, so it can run in a worker process."""
+    path, xs, ys, radius, annulus, zmag = job
+    fits = Fits.from_path(path)
+    data = fits.data
+    fluxes, ferrs, flag = sum_circle(data, xs, ys, radius, bkgann=annulus)
+    return _table(fits, data, fits.header["EXPTIME"], zmag, xs, ys, fluxes, ferrs)
+
+
+def _points(points: Union[pd.DataFrame, np.ndarray]) -> pd.DataFrame:
+    """Returns points as a xcentroid, ycentroid pd.DataFrame. An (N, 2) array is wrapped without a Python list."""
+    if isinstance(points, pd.DataFrame):
+        return points
+
+    return Fixer.list_to_source(np.asarray(points, dtype=np.float64).reshape(-1, 2))
 
 
 class APhot:
@@ -32,8 +146,7 @@ class APhot:
         self.fits_array = fits_array
         self.ZMag = 25
 
-        iraf.digiphot(Stdout=PIPE)
-        iraf.digiphot.apphot(Stdout=PIPE)
+        load_iraf("digiphot", "digiphot.apphot")
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}(id: {id(self)}, fits_array: {self.fits_array})"
@@ -41,76 +154,51 @@ class APhot:
     def __repr__(self) -> str:
         return self.__str__()
 
-    def __flux2mag(self, flux: float, flux_error: float, exptime: float) -> Tuple[float, float]:
-        logger.info(f"Converting to mag from flux. Parameters: {flux=}, {flux_error=}, {exptime=}")
-
-        if exptime == 0:
-            mag = self.ZMag + -2.5 * math.log10(flux)
-        else:
-            mag = self.ZMag + -2.5 * math.log10(flux) + 2.5 * math.log10(exptime)
-
-        if flux_error <= 0:
-            merr = 0
-        else:
-            merr = math.sqrt(flux / flux_error)
-
-        if math.isinf(merr):
-            merr = 0
-
-        return mag, merr
-
     def __extract(self, keys: Union[str, list[str]]) -> pd.DataFrame:
         logger.info(f"Extracting header from FitsArray. Parameters: {keys=}")
         headers = self.fits_array.hselect(keys)
         return headers
 
-    def photutils(self, points: pd.DataFrame, radius: int, radius_out: int = None,
-                  extract: Union[str, list[str]] = None) -> pd.DataFrame:
+    def photutils(self, points: Union[pd.DataFrame, np.ndarray], radius: int, radius_out: int = None,
+                  extract: Union[str, list[str]] = None, compute_errors: bool = True) -> pd.DataFrame:
         """
         Does photometry of given FitsArray using photutils and returns a pd.DataFrame.
 
         Parameters
         ----------
-        points: pd.DataFrame
-            A dataframe with x (xcentroid) and y (ycentroid) coordinates of sources for photometry.
+        points: pd.DataFrame or np.ndarray
+            A dataframe with x (xcentroid) and y (ycentroid) coordinates of sources for photometry, or an (N, 2) array
+            of x, y coordinates.
         radius: float
             Aperture value.
         radius_out: float, optional
             Radius for sky measurements.
         extract: str o List[str], optional
             Headers to be extracted from fits files during photometry.
+        compute_errors: bool, optional
+            If False the error image is not calculated, and ferr and merr are 0.
 
         Returns
         -------
         pd.DataFrame
             Photometric result.
         """
-        logger.info(f"Photutils photometry. Parameters: {points=}, {radius=}, {radius_out=}, {extract=}")
+        logger.info(
+            f"Photutils photometry. Parameters: {points=}, {radius=}, {radius_out=}, {extract=}, {compute_errors=}")
+        points = _points(points)
         if len(points) < 1:
             logger.error("No coordinates were found")
             raise NumberOfElementError("No coordinates were found")
 
-        table = []
+        positions = np.ascontiguousarray(points[["xcentroid", "ycentroid"]].to_numpy(dtype=np.float64))
         if radius_out is None:
-            aperture = CircularAperture(points[["xcentroid", "ycentroid"]].to_numpy().tolist(), r=radius)
+            aperture = CircularAperture(positions, r=radius)
         else:
-            aperture = CircularAnnulus(points[["xcentroid", "ycentroid"]].to_numpy().tolist(), r_in=radius,
-                                       r_out=radius_out)
-        for fits in self.fits_array:
-            clean_d = fits.data - fits.background().rms()
-            error = calc_total_error(fits.data, fits.background(as_array=True), fits.header["EXPTIME"])
-            phot_table = aperture_photometry(fits.data, aperture, error=error)
-            for line in phot_table:
-                value = clean_d[int(line["xcenter"].value)][int(line["ycenter"].value)]
-                snr = np.nan if value < 0 else math.sqrt(value)
-                table.append([abs(fits), line["xcenter"].value, line["ycenter"].value,
-                              *self.__flux2mag(line["aperture_sum"], line["aperture_sum_err"], fits.header["EXPTIME"]),
-                              line["aperture_sum"], line["aperture_sum_err"], snr])
-
-        phot_data = pd.DataFrame(table, columns=["image", "xcentroid", "ycentroid", "mag", "merr", "flux", "ferr",
-                                                 "SNR"]).set_index("image")
-
-        phot_data = phot_data.astype(float)
+            aperture = CircularAnnulus(positions, r_in=radius, r_out=radius_out)
+
+        jobs = [(abs(fits), aperture, self.ZMag, compute_errors) for fits in self.fits_array]
+        with process_pool(len(jobs)) as executor:
+            phot_data = _concat_tables([job[0] for job in jobs], executor.map(_photutils_frame, jobs))
 
         if extract is not None:
             extracted_headers = self.__extract(extract)
@@ -119,42 +207,40 @@ class APhot:
 
         return phot_data
 
-    def sep(self, points: pd.DataFrame, radius: int, extract: list[str] = None) -> pd.DataFrame:
+    def sep(self, points: Union[pd.DataFrame, np.ndarray], radius: int, extract: list[str] = None,
+            annulus: Tuple[float, float] = None) -> pd.DataFrame:
         """
-        Does photometry of given FitsArray using sep and returns a pd.DataFrame.
+        Does photometry of given FitsArray using sep and returns a pd.DataFrame. With an annulus the local sky is
+        subtracted, like iraf does, without IRAF's subprocess and text files.
 
         Parameters
         ----------
-        points: pd.DataFrame
-            A dataframe with x (xcentroid) and y (ycentroid) coordinates of sources for photometry.
+        points: pd.DataFrame or np.ndarray
+            A dataframe with x (xcentroid) and y (ycentroid) coordinates of sources for photometry, or an (N, 2) array
+            of x, y coordinates.
         radius: float
             Aperture value.
         extract: str o List[str], optional
             Headers to be extracted from fits files during photometry.
+        annulus: Tuple[float, float], optional
+            Inner and outer radius of the sky annulus. Equivalent to iraf's (annulus, annulus + dannulu).
 
         Returns
         -------
         pd.DataFrame
             Photometric result.
         """
-        logger.info(f"sep photometry. Parameters: {points=}, {radius=}, {extract=}")
+        logger.info(f"sep photometry. Parameters: {points=}, {radius=}, {extract=}, {annulus=}")
+        points = _points(points)
         if len(points) < 1:
             logger.error("No coordinates were found")
             raise NumberOfElementError("No coordinates were found")
 
-        table = []
-        for fits in self.fits_array:
-            clean_d = fits.data - fits.background().rms()
-            fluxes, ferrs, flag = sum_circle(fits.data, points["xcentroid"], points["ycentroid"], radius)
-            for x, y, flux, ferr in zip(points["xcentroid"], points["ycentroid"], fluxes, ferrs):
-                value = clean_d[int(x)][int(y)]
-                snr = np.nan if value < 0 else math.sqrt(value)
-                table.append([abs(fits), x, y, *self.__flux2mag(flux, ferr, fits.header["EXPTIME"]), flux, ferr, snr])
-
-        phot_data = pd.DataFrame(table, columns=["image", "xcentroid", "ycentroid", "mag", "merr", "flux", "ferr",
-                                                 "SNR"]).set_index("image")
-
-        phot_data = phot_data.astype(float)
+        xs = np.ascontiguousarray(points["xcentroid"].to_numpy(), dtype=np.float64)
+        ys = np.ascontiguousarray(points["ycentroid"].to_numpy(), dtype=np.float64)
+        jobs = [(abs(fits), xs, ys, radius, annulus, self.ZMag) for fits in self.fits_array]
+        with process_pool(len(jobs)) as executor:
+            phot_data = _concat_tables([job[0] for job in jobs], executor.map(_sep_frame, jobs))
 
         if extract is not None:
             extracted_headers = self.__extract(extract)
@@ -163,15 +249,16 @@ class APhot:
 
         return phot_data
 
-    def iraf(self, points: pd.DataFrame, aperture: float, annulus: float, dannulu: float,
+    def iraf(self, points: Union[pd.DataFrame, np.ndarray], aperture: float, annulus: float, dannulu: float,
              extract: list[str] = None) -> pd.DataFrame:
         """
         Does photometry of given FitsArray using iraf and returns a pd.DataFrame.
 
         Parameters
         ----------
-        points: pd.DataFrame
-            A dataframe with x (xcentroid) and y (ycentroid) coordinates of sources for photometry.
+        points: pd.DataFrame or np.ndarray
+            A dataframe with x (xcentroid) and y (ycentroid) coordinates of sources for photometry, or an (N, 2) array
+            of x, y coordinates.
         aperture: float
             Aperture value.
         annulus: float
@@ -187,6 +274,7 @@ class APhot:
             Photometric result.
         """
         logger.info("iraf photometry")
+        points = _points(points)
         if len(points) < 1:
             logger.error("No coordinates were found")
             raise NumberOfElementError("No coordinates were found")
@@ -215,25 +303,36 @@ class APhot:
                     iraf.digiphot.apphot.phot(f"'@{at_file}'", coords=f"{coo_file}", output=f"'@{output_files}'",
                                               interac="no", verify="no")
                     res = iraf.txdump(f"'@{output_files}'", "id,mag,merr,flux,stdev", "yes", Stdout=PIPE)
-                    res = pd.DataFrame([each.split() for each in res], columns=["id", "mag", "merr", "flux", "stdev"])
-
-                    result = []
-
-                    for each in res.groupby("id"):
-                        coords = points.iloc[int(each[0]) - 1][["xcentroid", "ycentroid"]].tolist()
-                        for i, fits in zip(range(len(each[1])), self.fits_array):
-                            clean_d = fits.data - fits.background().rms()
-                            phot = each[1].iloc[i]
-                            value = clean_d[int(coords[0])][int(coords[0])]
-                            snr = np.nan if value < 0 else math.sqrt(value)
-                            result.append(
-                                [abs(fits), coords[0], coords[1], phot.mag, phot.merr, phot.flux, phot.stdev, snr])
-
-                    phot_data = pd.DataFrame(result,
-                                             columns=["image", "xcentroid", "ycentroid", "mag", "merr", "flux", "ferr",
-                                                      "SNR"]).set_index("image")
-
-                    phot_data = phot_data.astype(float)
+                    res = pd.read_csv(io.StringIO("\n".join(res)), sep=r"\s+", header=None, engine="c",
+                                      names=["id", "mag", "merr", "flux", "stdev"], na_values=["INDEF"],
+                                      dtype={"id": np.int64, "mag": np.float64, "merr": np.float64,
+                                             "flux": np.float64, "stdev": np.float64})
+
+                    # txdump lists every source of each image in turn, so the n-th row of an id is of the n-th image.
+                    res["position"] = res.groupby("id", sort=False).cumcount()
+                    res = res[res["position"] < len(self.fits_array)].sort_values("id", kind="stable")
+                    positions = res["position"].to_numpy()
+                    xy = points[["xcentroid", "ycentroid"]].to_numpy(dtype=float)[res["id"].to_numpy() - 1]
+
+                    snr = np.full(len(res), np.nan)
+                    for i, fits in enumerate(self.fits_array):
+                        here = positions == i
+                        if not here.any():
+                            continue
+
+                        ix, iy = xy[here, 0].astype(int), xy[here, 1].astype(int)
+                        # Only the source pixels are read, from the memory-mapped data, not a full float32 copy.
+                        value = fits.pixels(ix, iy) - fits.background().rms()[iy, ix]
+                        with np.errstate(invalid="ignore"):
+                            snr[here] = np.where(value < 0, np.nan, np.sqrt(value))
+
+                    images = np.asarray(abs(self.fits_array))
+                    phot_data = pd.DataFrame(
+                        {"xcentroid": xy[:, 0], "ycentroid": xy[:, 1], "mag": res["mag"].to_numpy(dtype=float),
+                         "merr": res["merr"].to_numpy(dtype=float), "flux": res["flux"].to_numpy(dtype=float),
+                         "ferr": res["stdev"].to_numpy(dtype=float), "SNR": snr},
+                        index=pd.Index(images[positions], name="image")
+                    )
 
                     if extract is not None:
                         extracted_headers = self.__extract(extract)
@@ -1,21 +1,164 @@
 from __future__ import annotations
 import contextlib
+import multiprocessing
+import os
 import shutil
 import tempfile
-from glob import glob
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, reduce
 from pathlib import Path, PurePath
-from typing import List
+from typing import List, Tuple
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .fits import FitsArray
 
+import numpy as np
 import pandas as pd
+from astropy.io import fits as fts
+from pyraf import iraf
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 from .base_logger import logger
 from .errors import (EmissionValueError, NoiseValueError, OperandValueError,
                      OperationValueError, RejectionValueError, ScaleValueError)
 
+_OPERATIONS = frozenset({"average", "median"})
+_REJECTIONS = frozenset({"none", "minmax", "ccdclip", "crreject", "sigclip", "avsigclip", "pclip", None})
+_SCALES = frozenset({"none", "mode", "median", "mean", "exposure", "borderpix", None})
+_OPERANDS = frozenset({"+", "-", "*", "/"})
+_EMISSIONS = frozenset({"yes", "no"})
+_NOISES = frozenset({"poisson", "constant"})
+
+_UNLEARNED = set()
+# Temporary files and directories created by Fixer in this process. Removed by Fixer.tmp_cleaner.
+_CREATED = set()
+WRITE_BUFFER = 1 << 20
+
+
+@lru_cache(maxsize=None)
+def _load_package(package: str) -> None:
+    """Loads one IRAF package, discarding its banner. Cached, since the IRAF state is process-global."""
+    reduce(getattr, package.split("."), iraf)(Stdout=os.devnull)
+
+
+def load_iraf(*packages: str) -> None:
+    """
+    Loads the given IRAF packages (e.g. "noao", "digiphot.apphot") in order. Each package is loaded only once per
+    process.
+    """
+    for package in packages:
+        _load_package(package)
+
+
+@lru_cache(maxsize=None)
+def keep_process(task: str) -> None:
+    """
+    Locks the executable of the IRAF task in pyraf's process cache, so it keeps running between calls instead of being
+    started again for every call.
+    """
+    iraf.prcache(task)
+
+
+def process_pool(jobs: int) -> ProcessPoolExecutor:
+    """
+    Returns a process pool of at most one worker per CPU for the given number of jobs. Workers are spawned, not
+    forked, so they do not inherit the pyraf state (and the IRAF executables kept running in its process cache) of
+    the parent.
+    """
+    return ProcessPoolExecutor(max_workers=min(jobs, os.cpu_count() or 1),
+                               mp_context=multiprocessing.get_context("spawn"))
+
+
+def _clip(values: np.ndarray, sigma: float, maxiters: int) -> np.ndarray:
+    """
+    Returns values without the ones further than sigma standard deviations from their median, iterating until nothing
+    more is clipped or maxiters is reached. Compiled with numba if it is installed.
+    """
+    for _ in range(maxiters):
+        median = np.median(values)
+        std = np.std(values)
+        kept = values[(values >= median - sigma * std) & (values <= median + sigma * std)]
+        if kept.size == values.size:
+            break
+
+        values = kept
+
+    return values
+
+
+if njit is not None:
+    _clip = njit(cache=True)(_clip)
+
+
+def sigma_clipped_stats(data: np.ndarray, sigma: float = 3.0, maxiters: int = 5) -> Tuple[float, float, float]:
+    """
+    Returns the mean, median and standard deviation of the finite values of data after sigma clipping. Same result as
+    astropy.stats.sigma_clipped_stats with its default median/std clipping, but works on a flat array without masked
+    arrays.
+
+    Parameters
+    ----------
+    data: np.ndarray
+        Data to be clipped.
+    sigma: float, optional
+        Number of standard deviations to clip at. Default: 3.
+    maxiters: int, optional
+        Maximum number of clipping iterations. Default: 5.
+
+    Returns
+    -------
+    Tuple[float, float, float]
+        mean, median and standard deviation of the clipped data.
+    """
+    values = np.asarray(data, dtype=np.float64).ravel()
+    values = _clip(values[np.isfinite(values)], float(sigma), int(maxiters))
+    return float(np.mean(values)), float(np.median(values)), float(np.std(values))
+
+
+def unlearn_once(task):
+    """
+    Returns the IRAF task. Its parameters are unlearned only on its first use, since every call sets the same parameters
+    again.
+    """
+    if task.getName() not in _UNLEARNED:
+        task.unlearn()
+        _UNLEARNED.add(task.getName())
+
+    return task
+
+
+def write_fits(output: str, data: np.ndarray, header: fts.Header = None) -> None:
+    """
+    Writes data and header to a new fits file through a WRITE_BUFFER bytes buffer, so the HDU goes out in a few large
+    writes instead of one small write per 2880 bytes block. Every fits output of irony is written here. The buffer is
+    bounded so the image is not held twice in memory, as staging the whole HDU in an io.BytesIO would.
+    """
+    with open(output, "xb", buffering=WRITE_BUFFER) as f:
+        fts.PrimaryHDU(data, header=header).writeto(f, output_verify="silentfix", checksum=False)
+
+
+@contextlib.contextmanager
+def _temporary_file(text: str, suffix: str) -> str:
+    """Writes text to a new temporary file with a single write and yields its path. The file is removed afterwards."""
+    fd, name = tempfile.mkstemp(prefix="irony_", suffix=suffix)
+    try:
+        try:
+            data = memoryview(text.encode())
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+
+        yield name
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(name)
+
 
 class Fixer:
     @classmethod
@@ -41,9 +184,10 @@ class Fixer:
         return path
 
     @classmethod
+    @lru_cache(maxsize=16)
     def nonify(cls, value: str) -> str:
         """
-        Converts None to "none"
+        Converts None to "none". Cached, since it is called with the same few values on every combine.
 
         Parameters
         ----------
@@ -80,10 +224,13 @@ class Fixer:
         """
         logger.info(f"output started. Parameters: {value=}, {override=}, {delete=}, {prefix=}, {suffix=}")
 
-        if value is None:
+        temporary = value is None
+        if temporary:
             value = tempfile.NamedTemporaryFile(delete=delete, prefix=prefix, suffix=suffix).name
 
         value = cls.fitsify(value)
+        if temporary:
+            _CREATED.add(value)
 
         if Path(value).exists():
             if override:
@@ -92,6 +239,27 @@ class Fixer:
                 raise FileExistsError("File already exist")
         return value
 
+    @classmethod
+    def new_paths(cls, output: str, fits_array: FitsArray) -> List[str]:
+        """
+        Returns the paths of the files of fits_array moved to the output directory. A temporary directory is created if
+        output is not an existing directory.
+
+        Parameters
+        ----------
+        output: str
+        fits_array: FitsArray
+
+        Returns
+        -------
+        List[str]
+        """
+        if output is None or not Path(output).is_dir():
+            output = tempfile.mkdtemp(prefix="irony_")
+            _CREATED.add(output)
+
+        return [str(PurePath(output, each_file.path.name)) for each_file in fits_array]
+
     @classmethod
     @contextlib.contextmanager
     def to_new_directory(cls, output: str, fits_array: FitsArray) -> str:
@@ -108,18 +276,8 @@ class Fixer:
         """
         logger.info(f"to_new_directory started. Parameters: {output=}, {fits_array=}")
 
-        if output is None or not Path(output).is_dir():
-            output = tempfile.mkdtemp(prefix="irony_")
-
-        with tempfile.NamedTemporaryFile(delete=True, prefix="irony_", suffix=".fls", mode="w") as new_files_file:
-            to_write = []
-            for each_file in fits_array:
-                f = each_file.path
-                to_write.append(str(PurePath(output, f.name)))
-            new_files_file.write("\n".join(to_write))
-            new_files_file.flush()
-
-            yield new_files_file.name
+        with _temporary_file("\n".join(cls.new_paths(output, fits_array)), ".fls") as new_files_file:
+            yield new_files_file
 
     @classmethod
     @contextlib.contextmanager
@@ -136,11 +294,8 @@ class Fixer:
         """
         logger.info(f"at_file_from_list started. Parameters: {data=}")
 
-        with tempfile.NamedTemporaryFile(delete=True, prefix="irony_", suffix=".fls", mode="w") as new_files_file:
-            new_files_file.write("\n".join(map(str, data)))
-            new_files_file.flush()
-
-            yield new_files_file.name
+        with _temporary_file("\n".join(map(str, data)), ".fls") as new_files_file:
+            yield new_files_file
 
     @classmethod
     def yesnoify(cls, value: str) -> str:
@@ -172,11 +327,9 @@ class Fixer:
         str
         """
         logger.info(f"iraf_coords started. Parameters: {points=}")
-        with tempfile.NamedTemporaryFile(delete=True, prefix="irony_", suffix=".coo", mode="w") as new_files_file:
-            # file_name = tempfile.NamedTemporaryFile(delete=False, prefix="irony_", suffix=".coo").name
-            points[["xcentroid", "ycentroid"]].to_csv(new_files_file.name, sep=" ", header=False, index=False)
-            new_files_file.flush()
-            yield new_files_file.name
+        coords = points.to_csv(sep=" ", header=False, index=False, columns=["xcentroid", "ycentroid"])
+        with _temporary_file(coords, ".coo") as new_files_file:
+            yield new_files_file
 
     @classmethod
     def list_to_source(cls, sources: List[List[float]]) -> pd.DataFrame:
@@ -212,16 +365,22 @@ class Fixer:
     @classmethod
     def tmp_cleaner(cls):
         """
-        Cleans tem folder
+        Cleans the temporary files and directories created in this process. They are removed in parallel threads.
         Returns
         -------
 
         """
-        for path in glob("/tmp/irony*"):
-            if Path(path).is_file():
-                Path(path).unlink()
+        def remove(path: str) -> None:
+            if Path(path).is_dir():
+                shutil.rmtree(path, ignore_errors=True)
             else:
-                shutil.rmtree(path)
+                Path(path).unlink(missing_ok=True)
+
+        paths = list(_CREATED)
+        _CREATED.difference_update(paths)
+        if paths:
+            with ThreadPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as executor:
+                list(executor.map(remove, paths))
 
 
 class Check:
@@ -240,7 +399,7 @@ class Check:
         """
         logger.info(f"emision checking. Parameters: {value=}")
 
-        if not value.lower() in ["yes", "no"]:
+        if value.lower() not in _EMISSIONS:
             raise EmissionValueError("Emision value can only be one of: yes|no")
 
     @classmethod
@@ -258,7 +417,7 @@ class Check:
         """
         logger.info(f"noise checking. Parameters: {value=}")
 
-        if not value.lower() in ["poisson", "constant"]:
+        if value.lower() not in _NOISES:
             raise NoiseValueError("Noise value can only be one of: poisson|constant")
 
     @classmethod
@@ -276,7 +435,7 @@ class Check:
         """
         logger.info(f"operation checking. Parameters: {value=}")
 
-        if value not in ["average", "median"]:
+        if value not in _OPERATIONS:
             raise OperationValueError("Operation value can only be one of: average|median")
 
     @classmethod
@@ -294,9 +453,36 @@ class Check:
         """
         logger.info(f"rejection checking. Parameters: {value=}")
 
-        if value not in [ "none", "minmax", "ccdclip", "crreject", "sigclip", "avsigclip", "pclip", None]:
+        if value not in _REJECTIONS:
+            raise RejectionValueError("Rejection value can only be one of: none|minmax|ccdclip|crreject|sigclip|avsigclip|pclip")
+
+    @classmethod
+    def combine_params(cls, operation: str, rejection: str, scale: str = None) -> None:
+        """
+        Checks the operation, rejection and scale of a combine at once.
+
+        Parameters
+        ----------
+        operation: str
+        rejection: str
+        scale: str, optional
+
+        Returns
+        -------
+        None
+            None.
+        """
+        logger.info(f"combine_params checking. Parameters: {operation=}, {rejection=}, {scale=}")
+
+        if operation not in _OPERATIONS:
+            raise OperationValueError("Operation value can only be one of: average|median")
+
+        if rejection not in _REJECTIONS:
             raise RejectionValueError("Rejection value can only be one of: none|minmax|ccdclip|crreject|sigclip|avsigclip|pclip")
 
+        if scale not in _SCALES:
+            raise ScaleValueError("Scale value can only be one of: none|mode|median|mean|exposure|borderpix")
+
     @classmethod
     def operand(cls, value: str) -> None:
         """
@@ -312,7 +498,7 @@ class Check:
         """
         logger.info(f"operand checking. Parameters: {value=}")
 
-        if value not in ["+", "-", "*", "/"]:
+        if value not in _OPERANDS:
             raise OperandValueError("Operand value can only be one of: +|-|*|/")
 
     @classmethod
@@ -330,8 +516,8 @@ class Check:
         """
         logger.info(f"scale checking. Parameters: {value=}")
 
-        if value not in ["none", "mode", "median", "mean", "exposure", None]:
-            raise ScaleValueError("Scale value can only be one of: none|mode|median|mean|exposure")
+        if value not in _SCALES:
+            raise ScaleValueError("Scale value can only be one of: none|mode|median|mean|exposure|borderpix")
 
     @classmethod
     def is_none(cls, value: str) -> str:
@@ -1,66 +1,85 @@
+import argparse
+
 from src.irony import FitsArray, Combine, Calibration, \
     Calculator, Coordinates, APhot
 
-# Get all images available in directory
-fa = FitsArray.from_pattern("path*")
 
-# Group images by `IMAGETYP`. Zero, Dark, Flat and Images
-grouped = fa.groupby("IMAGETYP")
+def main():
+    parser = argparse.ArgumentParser(
+        prog='irony',
+        description='Calibrates, aligns and does photometry of images')
+    parser.add_argument('pattern', help="file path/pattern of all images")
+    parser.add_argument('-s', '--site', help="Name of the observation site", required=True)
+    parser.add_argument('-t', '--target', help="Name of the object", required=True)
+    parser.add_argument('-c', '--calibrated', help="Directory of calibrated images", default="cali")
+    parser.add_argument('-a', '--aligned', help="Directory of aligned images", default="ali")
+
+    args = parser.parse_args()
+
+    # Get all images available in directory
+    fa = FitsArray.from_pattern(args.pattern)
+
+    # Group images by `IMAGETYP`. Zero, Dark, Flat and Images
+    grouped = fa.groupby("IMAGETYP")
+
+    zeros = grouped["Bias Frame"]
+    darks = grouped["Dark Frame"]
+    flats = grouped["Flat Field"]
+    images = grouped["Light Frame"]
 
-zeros = grouped["Bias Frame"]
-darks = grouped["Dark Frame"]
-flats = grouped["Flat Field"]
-images = grouped["Light Frame"]
+    # Create a combiner to do zerocombine
+    z_combine = Combine(zeros)
+    master_zero = z_combine.zerocombine("median")
 
-# Create a combiner to do zerocombine
-z_combine = Combine(zeros)
-master_zero = z_combine.zerocombine("median")
+    # Group, darks, flats and images
+    dark_group = darks.groupby("EXPTIME")
+    flat_group = flats.groupby("FILTER")
+    images_group = images.groupby(["EXPTIME", "FILTER"])
 
+    for (expt, fltr), img in images_group.items():
+        # Create master dark for given exptime
+        d_combine = Combine(dark_group[expt])
+        mast_dark = d_combine.darkcombine("median")
 
-# Group, darks, flats and images
-dark_group = darks.groupby("EXPTIME")
-flat_group = flats.groupby("FILTER")
-images_group = images.groupby(["EXPTIME", "FILTER"])
+        # Create master flat for given filter
+        f_combine = Combine(flat_group[fltr])
+        mast_flat = f_combine.flatcombine("median")
 
-for (expt, fltr), img in images_group.items():
-    # Create master dark for given exptime
-    d_combine = Combine(dark_group[expt])
-    mast_dark = d_combine.darkcombine("median")
+        # Calibrate images and save them in `calibrated` directory
+        calibrator = Calibration(img)
+        calibrator.calibrate(output=args.calibrated, zero=master_zero,
+                             dark=mast_dark, flat=mast_flat)
 
-    # Create master flat for given filter
-    f_combine = Combine(flat_group[fltr])
-    mast_flat = f_combine.flatcombine("median")
+    # Get calibrated images.
+    calibrated = FitsArray.from_pattern(f"{args.calibrated}/*")
 
-    # Calibrate images and save them in `cali` directory
-    calibrator = Calibration(img)
-    calibrator.calibrate(output="cali", zero=master_zero,
-                         dark=mast_dark, flat=mast_flat)
+    # Align calibrated images and save them in `aligned` directory
+    aligned = calibrated.align(calibrated[0], output=args.aligned)
 
-# Get calibrated images.
-calibrated = FitsArray.from_pattern("cali/*")
+    site = Coordinates.location_from_name(args.site)
+    objc = Coordinates.position_from_name(args.target)
 
-# Align calibrated images and save them in `ali` directory
-aligned = calibrated.align(calibrated[0], output="ali")
+    c = Calculator(aligned)
 
-site = Coordinates.location_from_name("Location Name")
-objc = Coordinates.position_from_name("Object Name")
+    # Calculate and Add HJD to the header.
+    c.hjd("DATE-OBS", objc, new_key="HJD",
+          date_format="isot", scale="utc")
 
-c = Calculator(aligned)
+    # Calculate and Add AIRMASS/SECZ to the header.
+    c.sec_z("DATE-OBS", site, objc, new_key="AIRMASS",
+            date_format="isot", scale="utc")
 
-# Calculate and Add HJD to the header.
-c.hjd("DATE-OBS", objc, new_key="HJD",
-      date_format="isot", scale="utc")
+    aphot = APhot(aligned)
 
-# Calculate and Add AIRMASS/SECZ to the header.
-c.sec_z("DATE-OBS", site, objc, new_key="AIRMASS",
-        date_format="isot", scale="utc")
+    # Extract source coordinates
+    sources = aligned[0].daofind()
 
+    # Do iraf photometry
+    iraf_phot = aphot.iraf(sources, 10, 15, 20,
+                           extract=["HJD", "AIRMASS", "FILTER"])
 
-aphot = APhot(aligned)
+    return iraf_phot
 
-# Extract source coordinates
-sources = aligned[0].daofind()
 
-# Do iraf photometry
-iraf_phot = aphot.iraf(sources, 10, 15, 20,
-                       extract=["HJD", "AIRMASS", "FILTER"])
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,28 @@ from src.irony import Calculator, Coordinates, FitsArray
 FILES = "test/files/test*.fits"
 
 
-def test_jd_c():
+@pytest.fixture(scope="module")
+def dates():
     fa = FitsArray.from_pattern(FILES)
-    dates = fa.hselect("DATE-OBS").to_numpy().flatten().tolist()
+    return fa.hselect("DATE-OBS").to_numpy().flatten().tolist()
+
+
+def test_jd_c(dates):
     jds = Calculator.jd_c(dates).to_numpy().flatten().tolist()
     assert jds == pytest.approx([2456865.423257292, 2456865.421439815])
 
 
-def test_sec_z_c():
+def test_jd_c_auto(dates):
+    jds = Calculator.jd_c(dates, date_format="auto").to_numpy().flatten().tolist()
+    assert jds == pytest.approx([2456865.423257292, 2456865.421439815])
+
+    jds = Calculator.jd_c(["2456865.423257292", "2456865.421439815"], date_format="auto").to_numpy().flatten().tolist()
+    assert jds == pytest.approx([2456865.423257292, 2456865.421439815])
+
+
+def test_sec_z_c(dates):
     site = Coordinates.location(45, 45, 2000)
     v523_cas = Coordinates.position_from_name("v523 Cas")
-    fa = FitsArray.from_pattern(FILES)
-    dates = fa.hselect("DATE-OBS").to_numpy().flatten().tolist()
     secz = Calculator.sec_z_c(
         dates, site, v523_cas
     ).to_numpy().flatten().tolist()
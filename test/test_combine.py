@@ -1,6 +1,10 @@
+import pytest
+
+from pathlib import Path
 import numpy as np
 
-from src.irony import Combine, FitsArray
+from src.irony import Combine, Fixer, FitsArray
+from src.irony.errors import ScaleValueError
 
 
 def test_combine():
@@ -23,3 +27,75 @@ def test_combine():
     np.testing.assert_equal(
         np.sum([fa[0].data, fa[1].data], axis=0) % 65536, the_sum.data
     )
+
+
+def test_combine_many():
+    fa = FitsArray.from_pattern("test/files/test*.fits")
+
+    median, average = Combine.combine_many([(fa, {"operation": "median"}), (fa, {"operation": "average"})])
+    np.testing.assert_equal(
+        np.median([fa[0].data, fa[1].data], axis=0), median.data
+    )
+    np.testing.assert_equal(
+        np.mean([fa[0].data, fa[1].data], axis=0), average.data
+    )
+
+
+def test_combine_many_tmp_cleaner():
+    fa = FitsArray.from_pattern("test/files/test*.fits")
+
+    outputs = [abs(each) for each in Combine.combine_many([(fa, {"operation": "median"})])]
+    assert all(Path(each).exists() for each in outputs)
+
+    Fixer.tmp_cleaner()
+    assert not any(Path(each).exists() for each in outputs)
+
+
+def test_combine_matches_iraf():
+    fa = FitsArray.from_pattern("test/files/test*.fits")
+
+    for operation in ["median", "average"]:
+        np.testing.assert_allclose(
+            Combine(fa, use_iraf=True).combine(operation).data, Combine(fa).combine(operation).data
+        )
+
+    np.testing.assert_equal(Combine(fa, use_iraf=True).imsum().data, Combine(fa).imsum().data)
+
+
+def test_combine_minmax():
+    fa = FitsArray.from_pattern("test/files/test*.fits")
+    three = FitsArray([fa[0], fa[1], fa[0]])
+
+    c = Combine(three)
+    average = c.combine("average", reject="minmax")
+    np.testing.assert_allclose(
+        np.median([fa[0].data, fa[1].data, fa[0].data], axis=0), average.data
+    )
+
+    # The second call reuses the cached argmin/argmax of the first one.
+    np.testing.assert_allclose(average.data, c.zerocombine("average", reject="minmax").data)
+    np.testing.assert_allclose(average.data, c.combine("median", reject="minmax").data)
+
+
+def test_flatcombine_borderpix():
+    fa = FitsArray.from_pattern("test/files/test*.fits")
+    same = FitsArray([fa[0], fa[0], fa[0]])
+
+    flat = Combine(same).flatcombine("median", scale="borderpix")
+    np.testing.assert_allclose(fa[0].data, flat.data)
+
+    with pytest.raises(ScaleValueError):
+        Combine(same, use_iraf=True).flatcombine("median", scale="borderpix")
+
+
+def test_cr_mask_ignored_by_iraf():
+    fa = FitsArray.from_pattern("test/files/test*.fits")
+    three = FitsArray([fa[0], fa[1], fa[0]])
+
+    c = Combine(three, use_iraf=True)
+    c.crreject_prepass()
+    with pytest.warns(RuntimeWarning):
+        c.combine("median")
+
+    with pytest.warns(RuntimeWarning):
+        c.imsum()
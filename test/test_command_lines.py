@@ -0,0 +1,9 @@
+import importlib
+
+import pytest
+
+
+@pytest.mark.parametrize("name", ["ccdproc", "darkcombine", "flatcombine", "zerocombine"])
+def test_import(name):
+    module = importlib.import_module(f"command_lines.{name}")
+    assert callable(module.main)
@@ -8,6 +8,10 @@ def test_location_from_name():
     site = Coordinates.location_from_name("TUG")
     assert site.lat.deg == pytest.approx(36.824167)
     assert site.lon.deg == pytest.approx(30.335556)
+    assert Coordinates.location_from_name("TUG") is site
+
+    Coordinates.clear_cache()
+    assert Coordinates.location_from_name("TUG") is not site
 
 def test_location():
     site = Coordinates.location(45, 45, 2500)
@@ -26,3 +30,9 @@ def test_position():
     obj = Coordinates.position(10, 10)
     assert obj.ra.hourangle == pytest.approx(10)
     assert obj.dec.deg == pytest.approx(10)
+
+
+def test_position_array():
+    obj = Coordinates.position([10, 11], [10, 12])
+    assert obj.ra.hourangle.tolist() == pytest.approx([10, 11])
+    assert obj.dec.deg.tolist() == pytest.approx([10, 12])
@@ -9,6 +9,7 @@ from photutils.detection import DAOStarFinder
 from sep import Background
 
 from src.irony import Fits
+from src.irony import utils
 
 FILE = "test/files/test1.fits"
 
@@ -28,24 +29,22 @@ def test_imstat():
 
     assert fits.imstat == {
             'npix': data.size,
-            'mean': np.round(np.mean(data), 1),
-            'stddev': np.round(np.std(data), 1),
-            'min': np.round(np.min(data), 1),
-            'max': np.round(np.max(data), 1)
+            'mean': pytest.approx(np.mean(data)),
+            'stddev': pytest.approx(np.std(data)),
+            'min': np.min(data),
+            'max': np.max(data)
         }
 
 
+def assert_header_matches(fits):
+    h = afits.getheader(FILE)
+    assert fits.header == {each: h[each] for each in h if each}
+
+
 def test_header():
     fits = Fits.from_path(FILE)
 
-    h = afits.getheader(FILE)
-    h_as_dict = {
-        each: h[each]
-        for each in h
-        if each
-    }
-
-    assert fits.header == h_as_dict
+    assert_header_matches(fits)
 
 
 def test_data():
@@ -55,6 +54,14 @@ def test_data():
     )
 
 
+def test_pixels():
+    fits = Fits.from_path(FILE)
+    xs, ys = np.array([0, 10, 20]), np.array([5, 15, 25])
+    np.testing.assert_equal(
+        fits.pixels(xs, ys), afits.getdata(FILE)[ys, xs]
+    )
+
+
 def test_background():
     fits = Fits.from_path(FILE)
     bkg = Background(afits.getdata(FILE).astype(float))
@@ -68,49 +75,21 @@ def test_background():
 def test_hedit():
     fits = Fits.from_path(FILE)
 
-    h = afits.getheader(FILE)
-    h_as_dict = {
-        each: h[each]
-        for each in h
-        if each
-    }
-
-    assert fits.header == h_as_dict
+    assert_header_matches(fits)
 
     fits.hedit("IRON", "TEST")
 
-    h = afits.getheader(FILE)
-    h_as_dict = {
-        each: h[each]
-        for each in h
-        if each
-    }
-
-    assert fits.header == h_as_dict
+    assert_header_matches(fits)
     assert "IRON" in fits.header
 
     fits.hedit("IRON", delete=True)
 
-    h = afits.getheader(FILE)
-    h_as_dict = {
-        each: h[each]
-        for each in h
-        if each
-    }
-
-    assert fits.header == h_as_dict
+    assert_header_matches(fits)
     assert "IRON" not in fits.header
 
     fits.hedit("IRON", "DATE-OBS", value_is_key=True)
 
-    h = afits.getheader(FILE)
-    h_as_dict = {
-        each: h[each]
-        for each in h
-        if each
-    }
-
-    assert fits.header == h_as_dict
+    assert_header_matches(fits)
     assert "IRON" in fits.header
     assert fits.header["IRON"] == fits.header["DATE-OBS"]
 
@@ -169,6 +148,34 @@ def test_imarith():
         _ = fits.imarith("Not supported value", "-")
 
 
+def test_imarith_matches_iraf():
+    fits = Fits.from_path(FILE)
+
+    for other, operand in [(10, "*"), (2, "/"), (fits, "+"), (fits, "-")]:
+        np.testing.assert_allclose(
+            fits.imarith(other, operand, use_iraf=True).data, fits.imarith(other, operand).data
+        )
+
+
+def test_daofind_sep():
+    fits = Fits.from_path(FILE)
+
+    sources = fits.daofind(backend="sep")
+    assert sources.columns.tolist() == ["id", "xcentroid", "ycentroid", "npix", "peak", "flux"]
+    assert len(sources) > 0
+
+    with pytest.raises(ValueError):
+        _ = fits.daofind(backend="Not supported value")
+
+
+def test_sigma_clipped_stats():
+    data = afits.getdata(FILE)
+
+    np.testing.assert_allclose(
+        sigma_clipped_stats(data, sigma=3), utils.sigma_clipped_stats(data, sigma=3)
+    )
+
+
 def test_daofind():
     fits = Fits.from_path(FILE)
     sigma = 3
@@ -4,15 +4,27 @@ from glob import glob
 from pathlib import Path
 
 import numpy as np
+import pandas as pd
+from astropy.io import fits as fts
 
-from src.irony import FitsArray
+from src.irony import Fits, FitsArray
 from src.irony import ImageCountError
 
 FILES = "test/files/test*.fits"
 
 
-def test_abs():
-    fa = FitsArray.from_pattern(FILES)
+@pytest.fixture(scope="module")
+def fa():
+    return FitsArray.from_pattern(FILES)
+
+
+@pytest.fixture(scope="module")
+def cube():
+    # float32 pixel data of FILES, in the order from_pattern reads them.
+    return np.stack([fts.getdata(path).astype(np.float32) for path in glob(FILES)])
+
+
+def test_abs(fa):
     files = [str(Path(each).absolute()) for each in glob(FILES)]
 
     assert abs(fa) == files
@@ -21,116 +33,95 @@ def test_abs():
         _ = FitsArray.from_pattern("not_available/test*.fit")
 
 
-def test_at_file():
-    fa = FitsArray.from_pattern(FILES)
-
+def test_at_file(fa):
     with fa.at_file() as at_file:
-        with open(at_file, "r") as f2r:
-            assert f2r.read().split() == abs(fa)
+        assert Path(at_file).read_text().splitlines() == abs(fa)
 
 
-def test_imstat():
-    fa = FitsArray.from_pattern(FILES)
+def assert_header_matches(fa):
+    # Each header is read once from disk through a new Fits, so a stale FitsArray.header cache would be caught.
+    assert fa.header.to_dict("records") == [Fits.from_path(abs(fits)).header for fits in fa]
+
+
+def test_imstat(fa):
     stats = fa.imstat
-    for i in range(len(fa)):
-        assert stats.iloc[i].to_dict() == fa[i].imstat
+    expected = pd.DataFrame([fits.imstat for fits in fa], index=stats.index)
+    pd.testing.assert_frame_equal(stats, expected)
 
 
-def test_header():
-    fa = FitsArray.from_pattern(FILES)
-    header = fa.header
-    for i in range(len(fa)):
-        assert header.iloc[i].to_dict() == fa[i].header
+def test_header(fa):
+    assert_header_matches(fa)
 
 def test_hedit():
     fa = FitsArray.from_pattern(FILES)
 
-    header = fa.header
-    for i in range(len(fa)):
-        assert header.iloc[i].to_dict() == fa[i].header
+    assert_header_matches(fa)
 
     fa.hedit("IRON", "TEST")
-    header = fa.header
-    for i in range(len(fa)):
-        assert header.iloc[i].to_dict() == fa[i].header
+    assert_header_matches(fa)
 
     fa.hedit("IRON", delete=True)
-    header = fa.header
-    for i in range(len(fa)):
-        assert header.iloc[i].to_dict() == fa[i].header
+    assert_header_matches(fa)
 
     fa.hedit("IRON", "DATE-OBS", value_is_key=True)
-    header = fa.header
-    for i in range(len(fa)):
-        assert header.iloc[i].to_dict() == fa[i].header
+    assert_header_matches(fa)
 
     fa.hedit("IRON", delete=True)
-    header = fa.header
-    for i in range(len(fa)):
-        assert header.iloc[i].to_dict() == fa[i].header
+    assert_header_matches(fa)
 
 
-def test_hselect():
+def test_hedit_many():
     fa = FitsArray.from_pattern(FILES)
 
-    hselect = fa.hselect("DATE-OBS")
-    assert hselect.to_numpy().flatten().tolist() == [fa[0].header["DATE-OBS"], fa[1].header["DATE-OBS"]]
-
+    fa.hedit_many("IRON", ["TEST1", "TEST2"])
+    assert [fa[0].header["IRON"], fa[1].header["IRON"]] == ["TEST1", "TEST2"]
 
-def test_imarith():
-    fa = FitsArray.from_pattern(FILES)
+    fa.hedit("IRON", delete=True)
+    assert "IRON" not in fa[0].header
 
-    new_fa = fa.imarith(10, "*")
+    with pytest.raises(ValueError):
+        fa.hedit_many("IRON", ["TEST1"])
 
-    np.testing.assert_equal(
-        new_fa[0].data, fa[0].data * 10
-    )
 
-    np.testing.assert_equal(
-        new_fa[1].data, fa[1].data * 10
-    )
+def test_hedit_batch():
+    fa = FitsArray.from_pattern(FILES)
 
-    new_fa = fa.imarith(2, "/")
-    np.testing.assert_equal(
-        new_fa[0].data, fa[0].data / 2
-    )
+    fa.hedit_batch([
+        {"keys": "IRON", "values": "TEST"},
+        {"keys": ["IRON2", "IRON3"], "values": ["DATE-OBS", "IRON"], "value_is_key": True},
+    ])
+    for fits in fa:
+        assert fits.header["IRON"] == "TEST"
+        assert fits.header["IRON2"] == fits.header["DATE-OBS"]
+        assert fits.header["IRON3"] == "TEST"
 
-    np.testing.assert_equal(
-        new_fa[1].data, fa[1].data / 2
-    )
+    fa.hedit_batch([{"keys": ["IRON", "IRON2", "IRON3"], "delete": True}])
+    for fits in fa:
+        assert not {"IRON", "IRON2", "IRON3"} & set(fits.header)
 
-    new_fa = fa.imarith(fa, "+")
-    np.testing.assert_equal(
-        new_fa[0].data, fa[0].data * 2
-    )
 
-    np.testing.assert_equal(
-        new_fa[1].data, fa[1].data * 2
-    )
+def test_daofind(fa):
+    sources = fa.daofind()
+    for fits in fa:
+        expected = fits.daofind()
+        found = sources[sources["image"] == abs(fits)].drop(columns="image").reset_index(drop=True)
+        columns = ["xcentroid", "ycentroid", "flux"]
+        np.testing.assert_allclose(expected[columns], found[columns])
 
-    new_fa = fa.imarith(fa, "-")
-    np.testing.assert_equal(
-        new_fa[0].data, fa[0].data * 0
-    )
 
-    np.testing.assert_equal(
-        new_fa[1].data, fa[1].data * 0
-    )
+def test_hselect(fa):
+    hselect = fa.hselect("DATE-OBS")
+    assert hselect.to_numpy().ravel().tolist() == fa.header["DATE-OBS"].tolist()
 
-    new_fa = fa.imarith(fa[0], "-")
-    np.testing.assert_equal(
-        new_fa[0].data, fa[0].data * 0
-    )
 
-    np.testing.assert_equal(
-        new_fa[1].data, fa[1].data - fa[0].data
-    )
+def stack(fa):
+    return np.stack([fits.data for fits in fa])
 
-    new_fa = fa.imarith([2, 3], "*")
-    np.testing.assert_equal(
-        new_fa[0].data, fa[0].data * 2
-    )
 
-    np.testing.assert_equal(
-        new_fa[1].data, fa[1].data * 3
-    )
\ No newline at end of file
+def test_imarith(fa, cube):
+    np.testing.assert_equal(stack(fa.imarith(10, "*")), cube * 10)
+    np.testing.assert_equal(stack(fa.imarith(2, "/")), cube / 2)
+    np.testing.assert_equal(stack(fa.imarith(fa, "+")), cube * 2)
+    np.testing.assert_array_equal(stack(fa.imarith(fa, "-")), 0)
+    np.testing.assert_equal(stack(fa.imarith(fa[0], "-")), cube - cube[0])
+    np.testing.assert_equal(stack(fa.imarith([2, 3], "*")), cube * np.array([2, 3], dtype=cube.dtype)[:, None, None])
@@ -1,39 +1,57 @@
+import numpy as np
 import pytest
+from astropy.io import fits as afits
 
-
-from src.irony import APhot, FitsArray, Fixer
+from src.irony import APhot, FitsArray
 
 FILES = "test/files/test1.fits"
-SOURCES = Fixer.list_to_source([[1495.226807, 1398.818519]])
+SOURCES = np.array([[1495.226807, 1398.818519]])
 APE = 10
 ANN = 15
 DAN = 20
-EXPECTED_IRAF = [11.556, 0.005]
-EXPECTED_SEP = [13.52960, 0.0]
-EXPECTED_PHU = [13.58870, 4.470867]
+# Expected mag, merr of the first source.
+EXPECTED_IRAF = np.array([11.556, 0.005])
+EXPECTED_SEP = np.array([13.52960, 0.0])
+EXPECTED_PHU = np.array([13.58870, 4.470867])
 
 
-def test_sep():
-    fa = FitsArray.from_pattern(FILES)
-    aphot = APhot(fa)
-    phot = aphot.sep(SOURCES, APE)
-    for calc, obs in zip(phot[["mag", "merr"]].to_numpy().tolist()[0], EXPECTED_SEP):
-        assert calc == pytest.approx(obs)
+@pytest.fixture(scope="module")
+def aphot():
+    return APhot(FitsArray.from_pattern(FILES))
 
 
-def test_photutils():
-    fa = FitsArray.from_pattern(FILES)
-    aphot = APhot(fa)
+def test_sep(aphot):
+    phot = aphot.sep(SOURCES, APE)
+    np.testing.assert_allclose(phot[["mag", "merr"]].to_numpy()[0], EXPECTED_SEP, rtol=1e-6, atol=1e-12)
 
-    phot = aphot.photutils(SOURCES, APE, ANN)
-    for calc, obs in zip(phot[["mag", "merr"]].to_numpy().tolist()[0], EXPECTED_PHU):
-        assert calc == pytest.approx(obs)
 
+def test_photutils(aphot):
+    phot = aphot.photutils(SOURCES, APE, ANN)
+    np.testing.assert_allclose(phot[["mag", "merr"]].to_numpy()[0], EXPECTED_PHU, rtol=1e-6, atol=1e-12)
 
-def test_iraf():
-    fa = FitsArray.from_pattern(FILES)
-    aphot = APhot(fa)
 
+def test_iraf(aphot):
     phot = aphot.iraf(SOURCES, APE, ANN, DAN)
-    for calc, obs in zip(phot["mag"].to_numpy().tolist(), EXPECTED_IRAF):
-        assert calc == pytest.approx(obs)
+    np.testing.assert_allclose(phot[["mag", "merr"]].to_numpy()[0], EXPECTED_IRAF, rtol=1e-6, atol=1e-12)
+
+
+def test_sep_annulus(aphot):
+    plain = aphot.sep(SOURCES, APE)
+    annulus = aphot.sep(SOURCES, APE, annulus=(ANN, ANN + DAN))
+    # The sky measured in the annulus is subtracted, so the source is fainter than without it.
+    assert np.isfinite(annulus["flux"].to_numpy()).all()
+    assert (annulus["flux"].to_numpy() < plain["flux"].to_numpy()).all()
+    assert (annulus["mag"].to_numpy() > plain["mag"].to_numpy()).all()
+
+
+def test_snr_non_square(tmp_path):
+    # A single bright pixel at x >= height on a flat background: SNR is sqrt(peak - rms) = sqrt(10000 - 0).
+    x, y = 150, 20
+    data = np.full((50, 200), 100, dtype=np.float32)
+    data[y, x] = 10000
+    path = tmp_path / "non_square.fits"
+    afits.PrimaryHDU(data, afits.Header({"EXPTIME": 1})).writeto(path)
+
+    aphot = APhot(FitsArray.from_paths([str(path)]))
+    for phot in (aphot.sep(np.array([[x, y]]), 3), aphot.photutils(np.array([[x, y]]), 3)):
+        assert phot["SNR"].to_numpy()[0] == pytest.approx(100, rel=1e-2)